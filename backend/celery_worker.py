@@ -0,0 +1,10 @@
+"""
+Celery worker entry point for Lumina IQ RAG Backend.
+
+Run from the backend directory with: celery -A celery_worker worker
+"""
+
+from services.celery_service import celery_service
+
+celery_service.initialize()
+celery_app = celery_service.celery_app
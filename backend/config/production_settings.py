@@ -95,6 +95,8 @@ class ProductionSettings(BaseSettings):
     EMBEDDING_MODEL: str = Field(default="BAAI/bge-large-en-v1.5")
     EMBEDDING_DIMENSIONS: int = Field(default=1024)
     EMBEDDING_BATCH_SIZE: int = Field(default=32, description="Batch size for embedding generation")
+    EMBEDDING_CONCURRENCY: int = Field(default=4, description="Max embedding API requests in flight across all callers")
+    EMBEDDING_MAX_RETRY_WAIT: float = Field(default=10.0, description="Upper bound in seconds on a Retry-After wait for rate-limited embedding calls")
     
     # Qdrant Vector Store
     QDRANT_URL: str = Field(default="http://localhost:6333")
@@ -119,9 +121,13 @@ class ProductionSettings(BaseSettings):
     REDIS_URL: str = Field(default="redis://localhost:6379")
     REDIS_CACHE_DB: int = Field(default=0)
     REDIS_TASK_DB: int = Field(default=1)
+    REDIS_POOL_SIZE: int = Field(default=20)  # Max pooled connections per client
     
     # Cache Settings
     CACHE_EMBEDDINGS: bool = Field(default=True)
+    EMBEDDING_CACHE_INT8: bool = Field(default=False)  # Store cached embeddings as int8 (4x smaller, lossy)
+    EMBEDDING_CACHE_MAX_ENTRIES: int = Field(default=2000)  # In-process LRU in front of Redis
+    EMBEDDING_CACHE_TTL_SECONDS: int = Field(default=604800)  # Redis TTL for embeddings (7 days, +/-10% jitter)
     CACHE_QUERY_RESULTS: bool = Field(default=True)
     CACHE_TTL_SECONDS: int = Field(default=3600)
     
@@ -135,11 +141,16 @@ class ProductionSettings(BaseSettings):
     
     CELERY_BROKER_URL: str = Field(default="redis://localhost:6379/1")
     CELERY_RESULT_BACKEND: str = Field(default="redis://localhost:6379/2")
-    CELERY_TASK_SERIALIZER: str = Field(default="json")
-    CELERY_RESULT_SERIALIZER: str = Field(default="json")
-    CELERY_ACCEPT_CONTENT: List[str] = Field(default=["json"])
+    CELERY_TASK_SERIALIZER: str = Field(default="msgpack")
+    CELERY_RESULT_SERIALIZER: str = Field(default="msgpack")
+    CELERY_ACCEPT_CONTENT: List[str] = Field(default=["msgpack", "json"])  # json kept for in-flight tasks
     CELERY_TIMEZONE: str = Field(default="UTC")
     CELERY_ENABLE_UTC: bool = Field(default=True)
+    CELERY_WORKER_PREFETCH_MULTIPLIER: int = Field(default=1)  # Reserve one long task at a time
+    CELERY_WORKER_MAX_TASKS_PER_CHILD: int = Field(default=1000)
+    # Absolute resident-memory cap in KB (not growth); opt-in, set to baseline RSS plus headroom
+    CELERY_WORKER_MAX_MEMORY_PER_CHILD: Optional[int] = Field(default=None)
+    CELERY_ENABLE_EVENTS: bool = Field(default=False)  # Only enable when Flower/monitor is attached
     
     # ==================================================================================
     # LOGGING & MONITORING
@@ -62,6 +62,12 @@ class Settings(BaseSettings):
     LLAMAINDEX_CHUNK_OVERLAP: int = Field(default=256)  # Proportional overlap ~12.5%
     LLAMAINDEX_USE_FOR_LARGE_PDFS: bool = Field(default=True)
     LLAMAINDEX_LARGE_PDF_THRESHOLD_MB: int = Field(default=10)
+    LLAMAINDEX_PARALLEL_CHUNKING_MIN_DOCS: int = Field(default=64)  # Below this, pool startup costs more than it saves
+    LLAMAINDEX_CHUNKING_MAX_WORKERS: Optional[int] = Field(default=None)  # Defaults to os.cpu_count()
+
+    # Document deduplication hash: "sha256" or "blake3" (requires the blake3 extra).
+    # Hashes are stored in Qdrant payloads, so switching re-ingests existing books.
+    DEDUP_HASH_ALGORITHM: str = Field(default="sha256")
 
     # Qdrant Cloud Configuration
     QDRANT_URL: str = Field(
@@ -127,7 +133,16 @@ class Settings(BaseSettings):
     EMBEDDING_BATCH_SIZE: int = Field(
         default=50, description="Batch size for embedding generation (optimized for 32k context model)"
     )
+    EMBEDDING_CONCURRENCY: int = Field(
+        default=4, description="Max embedding API requests in flight across all callers"
+    )
+    EMBEDDING_MAX_RETRY_WAIT: float = Field(
+        default=10.0, description="Upper bound in seconds on a Retry-After wait for rate-limited embedding calls"
+    )
     CACHE_EMBEDDINGS: bool = Field(default=True)  # Enable caching for embeddings
+    EMBEDDING_CACHE_INT8: bool = Field(default=False)  # Store cached embeddings as int8 (4x smaller, lossy)
+    EMBEDDING_CACHE_MAX_ENTRIES: int = Field(default=2000)  # In-process LRU in front of Redis
+    EMBEDDING_CACHE_TTL_SECONDS: int = Field(default=604800)  # Redis TTL for embeddings (7 days, +/-10% jitter)
     CACHE_QUERY_RESULTS: bool = Field(default=True)  # Enable caching for query results
     CACHE_TTL_SECONDS: int = Field(default=3600)  # 1 hour cache TTL
     LOG_LEVEL: str = Field(default="DEBUG")  # Logging level
@@ -136,15 +151,21 @@ class Settings(BaseSettings):
     REDIS_URL: str = Field(default="redis://localhost:6379")
     REDIS_CACHE_DB: int = Field(default=0)  # Database for caching
     REDIS_TASK_DB: int = Field(default=1)  # Database for Celery tasks
+    REDIS_POOL_SIZE: int = Field(default=20)  # Max pooled connections per client
 
     # Celery Configuration
     CELERY_BROKER_URL: str = Field(default="redis://localhost:6379/1")
     CELERY_RESULT_BACKEND: str = Field(default="redis://localhost:6379/2")
-    CELERY_TASK_SERIALIZER: str = Field(default="json")
-    CELERY_RESULT_SERIALIZER: str = Field(default="json")
-    CELERY_ACCEPT_CONTENT: List[str] = Field(default=["json"])
+    CELERY_TASK_SERIALIZER: str = Field(default="msgpack")
+    CELERY_RESULT_SERIALIZER: str = Field(default="msgpack")
+    CELERY_ACCEPT_CONTENT: List[str] = Field(default=["msgpack", "json"])  # json kept for in-flight tasks
     CELERY_TIMEZONE: str = Field(default="UTC")
     CELERY_ENABLE_UTC: bool = Field(default=True)
+    CELERY_WORKER_PREFETCH_MULTIPLIER: int = Field(default=1)  # Reserve one long task at a time
+    CELERY_WORKER_MAX_TASKS_PER_CHILD: int = Field(default=1000)
+    # Absolute resident-memory cap in KB (not growth); opt-in, set to baseline RSS plus headroom
+    CELERY_WORKER_MAX_MEMORY_PER_CHILD: Optional[int] = Field(default=None)
+    CELERY_ENABLE_EVENTS: bool = Field(default=False)  # Only enable when Flower/monitor is attached
 
     # Circuit Breaker Configuration
     CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = Field(default=5)
@@ -17,6 +17,8 @@ import asyncio
 # Initialize services
 from services.auth_service import auth_service
 from services.cache_service import cache_service
+from services.chat_service import chat_service
+from services.chunking_service import chunking_service
 from services.celery_service import celery_service
 from services.rag_orchestrator import rag_orchestrator
 from services.together_service import together_service
@@ -256,6 +258,22 @@ async def lifespan(app: FastAPI):
     logger.debug("Shutting down Learning App API...")
 
     # Gracefully shut down services
+    try:
+        await chat_service.cleanup()
+    except Exception as e:
+        logger.error(
+            f"Error closing chat service: {str(e)}",
+            extra={"extra_fields": {"error_type": type(e).__name__}},
+        )
+
+    try:
+        chunking_service.cleanup()
+    except Exception as e:
+        logger.error(
+            f"Error shutting down chunking process pool: {str(e)}",
+            extra={"extra_fields": {"error_type": type(e).__name__}},
+        )
+
     if cache_initialized:
         try:
             await cache_service.close()
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
+from datetime import datetime
 import hashlib
 from models.chat import (
     ChatMessage,
@@ -19,6 +21,9 @@ logger = get_logger("chat_routes")
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
+# Appended to a streamed answer that failed after the response started
+STREAM_ERROR_MARKER = "\n\n[Error: the response could not be completed]"
+
 
 def get_simple_user_id(request: Request) -> str:
     """
@@ -48,8 +53,6 @@ async def chat(message: ChatMessage, request: Request):
     )
 
     try:
-        import datetime
-
         user_session = get_simple_user_id(request)
 
         # Use RAG orchestrator to get context and generate response
@@ -63,7 +66,7 @@ async def chat(message: ChatMessage, request: Request):
 
         response = ChatResponse(
             response=result.get("response", "I couldn't generate a response."),
-            timestamp=datetime.datetime.now().isoformat(),
+            timestamp=datetime.now().isoformat(),
         )
 
         logger.info(
@@ -80,6 +83,42 @@ async def chat(message: ChatMessage, request: Request):
         clear_request_id()
 
 
+@router.post("/stream")
+async def chat_stream(message: ChatMessage, request: Request):
+    """Stream the AI assistant's answer as it is generated - first tokens arrive without waiting for the full completion"""
+    # Set request ID for tracing
+    request_id = set_request_id()
+
+    logger.info(
+        f"Streaming chat request received - endpoint: {'/api/chat/stream'}, method: {'POST'}, user_agent: {request.headers.get('user-agent')}"
+    )
+
+    if not rag_orchestrator.is_initialized:
+        clear_request_id()
+        raise HTTPException(status_code=503, detail="RAG orchestrator not initialized")
+
+    async def stream():
+        # The body is produced after this handler returns, so the request ID
+        # is (re)set here and cleared only once the stream finishes
+        set_request_id(request_id)
+        try:
+            async for chunk in rag_orchestrator.stream_chat_response(
+                query=message.message, top_k=5
+            ):
+                yield chunk
+        except Exception as e:
+            # Headers are already sent, so the failure can only be reported in-band
+            logger.error(
+                f"Streaming chat request failed - error_type: {type(e).__name__}, error_message: {str(e)}"
+            )
+            yield STREAM_ERROR_MARKER
+        finally:
+            clear_request_id()
+
+    clear_request_id()
+    return StreamingResponse(stream(), media_type="text/plain; charset=utf-8")
+
+
 @router.get("/history")
 async def get_chat_history(request: Request):
     """Get the chat history for the current session"""
@@ -107,8 +146,6 @@ async def generate_questions(request: QuestionGenerationRequest, http_request: R
     )
 
     try:
-        import datetime
-
         user_session = get_simple_user_id(http_request)
 
         # Use the new RAG orchestrator for question generation
@@ -130,7 +167,7 @@ async def generate_questions(request: QuestionGenerationRequest, http_request: R
         if result.get("success"):
             response = ChatResponse(
                 response=result["response"],
-                timestamp=datetime.datetime.now().isoformat(),
+                timestamp=datetime.now().isoformat(),
             )
 
             logger.info(
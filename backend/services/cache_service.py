@@ -7,20 +7,106 @@ retrieval results, and API responses.
 
 import hashlib
 import json
-from typing import Any, Optional, List, Dict
+import random
+import struct
+from functools import lru_cache, partial
+from typing import Any, Optional, List, Dict, Tuple, Union
+import numpy as np
 import redis.asyncio as redis
 from redis.asyncio import Redis
+from redis.utils import HIREDIS_AVAILABLE
 from config.settings import settings
 from utils.logger import get_logger
 
+try:
+    import orjson
+
+    # Module-level codec singletons reused by every set_json/get_json call
+    _json_encode = partial(orjson.dumps, option=orjson.OPT_NON_STR_KEYS)
+    _json_decode = orjson.loads
+    _JSON_DECODES_BYTES = True
+except ImportError:
+    _json_encode = json.JSONEncoder(separators=(",", ":")).encode
+    _json_decode = json.JSONDecoder().decode
+    _JSON_DECODES_BYTES = False
+
 logger = get_logger("cache_service")
 
+# Binary embedding encoding: a tag byte, then the payload. JSON values (which
+# start with "[") stay readable so entries written before this still decode.
+_EMBEDDING_FLOAT32_TAG = b"f"
+_EMBEDDING_INT8_TAG = b"q"
+_SCALE = struct.Struct("<f")
+
+
+def quantize_int8(embedding: Any) -> Tuple[np.ndarray, float]:
+    """Symmetric per-vector int8 quantization: embedding ~= q * scale."""
+    v = np.asarray(embedding, dtype=np.float32)
+    scale = float(np.abs(v).max()) / 127.0 or 1.0
+    return np.rint(v / scale).astype(np.int8), scale
+
+
+def _encode_embedding(embedding: List[float]) -> bytes:
+    """Serialize an embedding for Redis as raw little-endian float32 (or int8)."""
+    if settings.EMBEDDING_CACHE_INT8:
+        q, scale = quantize_int8(embedding)
+        return _EMBEDDING_INT8_TAG + _SCALE.pack(scale) + q.tobytes()
+    v = np.asarray(embedding, dtype="<f4")
+    return _EMBEDDING_FLOAT32_TAG + v.tobytes()
+
+
+def _decode_embedding(value: bytes) -> List[float]:
+    """Inverse of _encode_embedding."""
+    tag = value[:1]
+    if tag == _EMBEDDING_FLOAT32_TAG:
+        return np.frombuffer(value, dtype="<f4", offset=1).tolist()
+    if tag == _EMBEDDING_INT8_TAG:
+        (scale,) = _SCALE.unpack_from(value, 1)
+        q = np.frombuffer(value, dtype=np.int8, offset=1 + _SCALE.size)
+        return (q.astype(np.float32) * scale).tolist()
+    # orjson parses bytes directly; the stdlib decoder only takes str
+    return _json_decode(value if _JSON_DECODES_BYTES else value.decode())
+
+
+@lru_cache(maxsize=1024)
+def _hash_context_items(items: frozenset) -> str:
+    """Hash a frozen context mapping; memoized so repeated contexts skip serialization."""
+    canonical = json.dumps(dict(items), sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def context_hash(context: Dict[str, Any]) -> str:
+    """Return a stable hash for a retrieval context (token/filename/model)."""
+    try:
+        return _hash_context_items(frozenset(context.items()))
+    except TypeError:
+        # Unhashable values (nested dicts/lists) - fall back to direct serialization
+        canonical = json.dumps(context, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def _embedding_ttl() -> int:
+    """Embedding TTL with +/-10% jitter so keys written together don't expire together."""
+    return int(settings.EMBEDDING_CACHE_TTL_SECONDS * random.uniform(0.9, 1.1))
+
+
+def embedding_key(model: str, text: str) -> str:
+    """Content-addressed cache key for an embedding of ``text`` under ``model``.
+
+    Hashes the exact text in one blake2b call instead of going through
+    _generate_key, which re-tokenizes the whole text to normalize whitespace.
+    """
+    digest = hashlib.blake2b(f"{model}\0{text}".encode(), digest_size=16).hexdigest()
+    return f"embed:{digest}"
+
 
 class CacheService:
     """Redis-based caching service with semantic cache support."""
 
     def __init__(self):
         self.redis_client: Optional[Redis] = None
+        # Same server/db without response decoding, for binary embedding values
+        self.binary_client: Optional[Redis] = None
         self.is_initialized = False
 
     async def initialize(self) -> None:
@@ -33,7 +119,12 @@ class CacheService:
 
             logger.info(
                 f"Initializing Redis cache service",
-                extra={"extra_fields": {"redis_url": redis_url.split("@")[-1]}},
+                extra={
+                    "extra_fields": {
+                        "redis_url": redis_url.split("@")[-1],
+                        "hiredis_parser": HIREDIS_AVAILABLE,
+                    }
+                },
             )
 
             self.redis_client = await redis.from_url(
@@ -46,6 +137,15 @@ class CacheService:
                 health_check_interval=30,
             )
 
+            self.binary_client = await redis.from_url(
+                redis_url,
+                db=settings.REDIS_CACHE_DB,
+                decode_responses=False,
+                socket_connect_timeout=5,
+                socket_keepalive=True,
+                health_check_interval=30,
+            )
+
             # Test connection
             await self.redis_client.ping()
             self.is_initialized = True
@@ -70,6 +170,8 @@ class CacheService:
 
     async def close(self) -> None:
         """Close Redis connection."""
+        if self.binary_client:
+            await self.binary_client.close()
         if self.redis_client:
             await self.redis_client.close()
             logger.info("Redis cache service closed")
@@ -114,7 +216,7 @@ class CacheService:
             return None
 
     async def set(
-        self, key: str, value: str, ttl: Optional[int] = None
+        self, key: str, value: Union[str, bytes], ttl: Optional[int] = None
     ) -> bool:
         """Set value in cache with optional TTL."""
         if not self.is_initialized or not self.redis_client:
@@ -156,7 +258,7 @@ class CacheService:
         value = await self.get(key)
         if value:
             try:
-                return json.loads(value)
+                return _json_decode(value)
             except json.JSONDecodeError as e:
                 logger.error(
                     f"Failed to decode JSON from cache: {str(e)}",
@@ -169,7 +271,7 @@ class CacheService:
     ) -> bool:
         """Set JSON value in cache."""
         try:
-            json_value = json.dumps(value)
+            json_value = _json_encode(value)
             return await self.set(key, json_value, ttl)
         except (TypeError, ValueError) as e:
             logger.error(
@@ -179,33 +281,134 @@ class CacheService:
             return False
 
     async def cache_embedding(
-        self, text: str, embedding: List[float], model: str
+        self,
+        text: str,
+        embedding: List[float],
+        model: str,
+        key: Optional[str] = None,
     ) -> bool:
-        """Cache embedding for text."""
-        key = self._generate_key("embed", model, text)
-        return await self.set_json(key, embedding, ttl=86400)  # 24 hours
+        """Cache embedding for text.
+
+        Pass ``key`` (from ``embedding_key(model, text)``) if the caller already
+        computed it, to avoid hashing the text again.
+        """
+        if not self.is_initialized or not self.binary_client:
+            return False
+
+        key = key or embedding_key(model, text)
+        try:
+            await self.binary_client.setex(key, _embedding_ttl(), _encode_embedding(embedding))
+            logger.debug(f"Cache SET: {key}")
+            return True
+        except Exception as e:
+            logger.error(
+                f"Cache set error: {str(e)}",
+                extra={"extra_fields": {"key": key, "error_type": type(e).__name__}},
+            )
+            return False
 
     async def get_cached_embedding(
-        self, text: str, model: str
+        self, text: str, model: str, key: Optional[str] = None
     ) -> Optional[List[float]]:
         """Get cached embedding for text."""
-        key = self._generate_key("embed", model, text)
-        return await self.get_json(key)
+        return (
+            await self.get_cached_embeddings(
+                [text], model, keys=[key] if key else None
+            )
+        )[0]
+
+    async def get_cached_embeddings(
+        self, texts: List[str], model: str, keys: Optional[List[str]] = None
+    ) -> List[Optional[List[float]]]:
+        """Get cached embeddings for many texts in one MGET round trip.
+
+        Results are aligned with ``texts``; misses are None. Pass ``keys``
+        (aligned with ``texts``) if the caller already computed them.
+        """
+        if not self.is_initialized or not self.binary_client or not texts:
+            return [None] * len(texts)
+
+        if keys is None:
+            keys = [embedding_key(model, text) for text in texts]
+        try:
+            values = await self.binary_client.mget(keys)
+        except Exception as e:
+            logger.error(
+                f"Cache mget error: {str(e)}",
+                extra={"extra_fields": {"key_count": len(keys), "error_type": type(e).__name__}},
+            )
+            return [None] * len(texts)
+
+        embeddings: List[Optional[List[float]]] = []
+        for key, value in zip(keys, values):
+            if value:
+                try:
+                    embeddings.append(_decode_embedding(value))
+                    continue
+                except (ValueError, struct.error) as e:
+                    logger.error(
+                        f"Failed to decode embedding from cache: {str(e)}",
+                        extra={"extra_fields": {"key": key}},
+                    )
+            embeddings.append(None)
+
+        logger.debug(
+            "Cache MGET",
+            extra={"extra_fields": {"key_count": len(keys), "hits": sum(e is not None for e in embeddings)}},
+        )
+        return embeddings
+
+    async def cache_embeddings(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        model: str,
+        keys: Optional[List[str]] = None,
+    ) -> bool:
+        """Cache many embeddings with a single pipelined round trip.
+
+        Pass ``keys`` (aligned with ``texts``) if the caller already computed them.
+        """
+        if not self.is_initialized or not self.binary_client or not texts:
+            return False
+
+        if keys is None:
+            keys = [embedding_key(model, text) for text in texts]
+        try:
+            async with self.binary_client.pipeline(transaction=False) as pipe:
+                for key, embedding in zip(keys, embeddings):
+                    pipe.setex(key, _embedding_ttl(), _encode_embedding(embedding))
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(
+                f"Cache pipeline set error: {str(e)}",
+                extra={"extra_fields": {"key_count": len(texts), "error_type": type(e).__name__}},
+            )
+            return False
 
     async def cache_retrieval_results(
-        self, query: str, results: List[Dict[str, Any]], context: Dict[str, Any]
+        self,
+        query: str,
+        results: List[Dict[str, Any]],
+        context: Dict[str, Any],
+        ctx_hash: Optional[str] = None,
     ) -> bool:
-        """Cache retrieval results for a query."""
-        key = self._generate_key("retrieval", json.dumps(context, sort_keys=True), query)
+        """Cache retrieval results for a query.
+
+        Pass ``ctx_hash`` (from ``context_hash(context)``) when issuing several
+        cache calls for the same request to avoid re-hashing the context.
+        """
+        key = self._generate_key("retrieval", ctx_hash or context_hash(context), query)
         return await self.set_json(
             key, {"query": query, "results": results, "context": context}, ttl=3600
         )  # 1 hour
 
     async def get_cached_retrieval_results(
-        self, query: str, context: Dict[str, Any]
+        self, query: str, context: Dict[str, Any], ctx_hash: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
         """Get cached retrieval results for a query."""
-        key = self._generate_key("retrieval", json.dumps(context, sort_keys=True), query)
+        key = self._generate_key("retrieval", ctx_hash or context_hash(context), query)
         return await self.get_json(key)
 
     async def cache_api_response(
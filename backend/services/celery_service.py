@@ -4,21 +4,132 @@ Celery Service for Lumina IQ RAG Backend.
 Handles background task processing for document ingestion and batch operations.
 """
 
-from typing import Dict, Any, Optional
-from celery import Celery
+import asyncio
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from celery import Celery, chord, group, states
+from celery.concurrency import get_implementation
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
+from celery.utils import uuid
 from pathlib import Path
 from config.settings import settings
 from utils.logger import get_logger
+from .embedding_service import embedding_service
+from .rag_orchestrator import rag_orchestrator
+
+try:
+    import uvloop  # type: ignore
+except ImportError:
+    uvloop = None
 
 logger = get_logger("celery_service")
 
+# Single source of truth for Celery configuration
+_CELERY_CONF: Dict[str, Any] = {
+    "task_serializer": settings.CELERY_TASK_SERIALIZER,
+    "result_serializer": settings.CELERY_RESULT_SERIALIZER,
+    "accept_content": settings.CELERY_ACCEPT_CONTENT,
+    "timezone": settings.CELERY_TIMEZONE,
+    "enable_utc": settings.CELERY_ENABLE_UTC,
+    "task_track_started": True,
+    "task_time_limit": 3600,  # 1 hour
+    "task_soft_time_limit": 3300,  # 55 minutes
+    "worker_prefetch_multiplier": settings.CELERY_WORKER_PREFETCH_MULTIPLIER,
+    "task_acks_late": True,  # Ack only after completion so crashed tasks are redelivered
+    "task_reject_on_worker_lost": True,
+    # Recycle children after many tasks (or past an opt-in RSS cap) rather
+    # than every few dozen tasks
+    "worker_max_tasks_per_child": settings.CELERY_WORKER_MAX_TASKS_PER_CHILD,
+    "worker_max_memory_per_child": settings.CELERY_WORKER_MAX_MEMORY_PER_CHILD,
+    # Task events cost an extra broker publish per submission/state change
+    "task_send_sent_event": settings.CELERY_ENABLE_EVENTS,
+    "worker_send_task_events": settings.CELERY_ENABLE_EVENTS,
+    # Keep broker/backend connections pooled and alive between status polls
+    "broker_pool_limit": settings.REDIS_POOL_SIZE,
+    "broker_transport_options": {
+        "max_connections": settings.REDIS_POOL_SIZE,
+        "socket_keepalive": True,
+        "health_check_interval": 30,
+    },
+    "redis_max_connections": settings.REDIS_POOL_SIZE,
+    "redis_socket_keepalive": True,
+    "redis_backend_health_check_interval": 30,
+}
+
+# Delete the dedup key only while it still holds our task ID, so a task that
+# outlived the key's TTL can't release a newer submission's claim
+_RELEASE_DEDUP_KEY_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Event loop owned by the current worker process and reused across tasks.
+# Only one task may drive it at a time, which is why tasks are restricted to
+# the prefork and solo pools: threads/eventlet/gevent would run several tasks
+# on it concurrently, and the services' shared semaphores and HTTP clients are
+# bound to a single loop as well
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_SUPPORTED_POOLS = ("prefork", "solo")
+
+
+@worker_init.connect
+def _check_worker_pool(sender=None, **kwargs) -> None:
+    """Refuse to start under a pool that runs tasks concurrently in one process."""
+    pool_cls = getattr(sender, "pool_cls", None)
+    if pool_cls is None:
+        return
+    # pool_cls may still be an alias such as "prefork" when worker_init fires
+    pool_name = get_implementation(pool_cls).__module__.rsplit(".", 1)[-1]
+    if pool_name not in _SUPPORTED_POOLS:
+        raise RuntimeError(
+            f"Unsupported Celery pool '{pool_name}': tasks share one event loop "
+            f"per process, so only the {' and '.join(_SUPPORTED_POOLS)} pools are supported"
+        )
+
+
+@worker_process_init.connect
+def _init_worker_loop(**kwargs) -> None:
+    """Create the worker's persistent event loop (uvloop when available)."""
+    global _worker_loop
+    _worker_loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+
+
+@worker_process_shutdown.connect
+def _close_worker_loop(**kwargs) -> None:
+    """Shut down the worker's event loop on process exit."""
+    global _worker_loop
+    if _worker_loop is not None and not _worker_loop.is_closed():
+        _worker_loop.run_until_complete(_worker_loop.shutdown_asyncgens())
+        _worker_loop.close()
+    _worker_loop = None
+
+
+def _run_in_worker_loop(coro):
+    """Run a coroutine to completion on the worker's persistent event loop."""
+    if _worker_loop is None or _worker_loop.is_closed():
+        # The solo pool doesn't emit worker_process_init
+        _init_worker_loop()
+    return _worker_loop.run_until_complete(coro)
+
 
 class CeleryService:
     """Service for managing Celery background tasks."""
 
+    # Terminal task states never change, so their status dicts are kept in-process
+    STATUS_CACHE_TTL = 300
+    STATUS_CACHE_MAX_SIZE = 10_000
+
     def __init__(self):
         self.celery_app: Optional[Celery] = None
         self.is_initialized = False
+        self._status_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
 
     def initialize(self) -> None:
         """Initialize Celery application."""
@@ -50,20 +161,16 @@ class CeleryService:
             )
 
             # Configure Celery
-            self.celery_app.conf.update(
-                task_serializer=settings.CELERY_TASK_SERIALIZER,
-                result_serializer=settings.CELERY_RESULT_SERIALIZER,
-                accept_content=["json"],
-                timezone=settings.CELERY_TIMEZONE,
-                enable_utc=settings.CELERY_ENABLE_UTC,
-                task_track_started=True,
-                task_time_limit=3600,  # 1 hour
-                task_soft_time_limit=3300,  # 55 minutes
-                worker_prefetch_multiplier=1,
-                worker_max_tasks_per_child=100,
-            )
+            self.celery_app.conf.update(**_CELERY_CONF)
 
             self.is_initialized = True
+
+            # Register tasks here so both the API (which submits them by name)
+            # and the worker (celery -A celery_worker) know every task
+            self.create_task_ingest_document()
+            self.create_task_batch_embeddings()
+            self.create_task_assemble_embeddings()
+
             logger.info("Celery service initialized successfully")
 
         except Exception as e:
@@ -80,12 +187,16 @@ class CeleryService:
             logger.warning("Celery service not initialized, cannot create tasks")
             return None
 
+        service = self
+
         @self.celery_app.task(name="tasks.ingest_document", bind=True)
-        def ingest_document_task(self, file_path: str, metadata: Optional[Dict[str, Any]] = None):
+        def ingest_document_task(
+            self,
+            file_path: str,
+            metadata: Optional[Dict[str, Any]] = None,
+            dedup_key: Optional[str] = None,
+        ):
             """Background task for document ingestion."""
-            import asyncio
-            from .rag_orchestrator import rag_orchestrator
-
             logger.info(
                 f"Starting background document ingestion",
                 extra={"extra_fields": {"file_path": file_path, "task_id": self.request.id}},
@@ -97,7 +208,7 @@ class CeleryService:
                     rag_orchestrator.initialize()
 
                 # Run ingestion
-                result = asyncio.run(
+                result = _run_in_worker_loop(
                     rag_orchestrator.ingest_document(
                         file_path=Path(file_path),
                         metadata=metadata,
@@ -123,6 +234,10 @@ class CeleryService:
                 )
                 return {"success": False, "error": str(e)}
 
+            finally:
+                if dedup_key:
+                    service._release_ingest_dedup_key(dedup_key, self.request.id)
+
         return ingest_document_task
 
     def create_task_batch_embeddings(self):
@@ -134,9 +249,6 @@ class CeleryService:
         @self.celery_app.task(name="tasks.batch_embeddings", bind=True)
         def batch_embeddings_task(self, texts: list, cache: bool = True):
             """Background task for batch embedding generation."""
-            import asyncio
-            from .embedding_service import embedding_service
-
             logger.info(
                 f"Starting background batch embedding generation",
                 extra={"extra_fields": {"text_count": len(texts), "task_id": self.request.id}},
@@ -148,7 +260,7 @@ class CeleryService:
                     embedding_service.initialize()
 
                 # Generate embeddings
-                embeddings = asyncio.run(
+                embeddings = _run_in_worker_loop(
                     embedding_service.generate_embeddings_batch(texts, use_cache=cache)
                 )
 
@@ -173,6 +285,25 @@ class CeleryService:
 
         return batch_embeddings_task
 
+    def create_task_assemble_embeddings(self):
+        """Create Celery chord callback that combines batch embedding results."""
+        if not self.is_initialized or not self.celery_app:
+            logger.warning("Celery service not initialized, cannot create tasks")
+            return None
+
+        @self.celery_app.task(name="tasks.assemble_embeddings")
+        def assemble_embeddings_task(results: list):
+            """Combine per-chunk batch embedding results into one summary."""
+            errors = [r.get("error") for r in results if not r.get("success")]
+            return {
+                "success": not errors,
+                "embedding_count": sum(r.get("embedding_count", 0) for r in results),
+                "chunk_count": len(results),
+                "errors": errors,
+            }
+
+        return assemble_embeddings_task
+
     def submit_ingest_document(
         self, file_path: str, metadata: Optional[Dict[str, Any]] = None
     ) -> Optional[str]:
@@ -187,7 +318,31 @@ class CeleryService:
                 logger.error("Ingest document task not registered")
                 return None
 
-            result = task.apply_async(args=[file_path, metadata])
+            # Skip enqueueing if an identical ingestion is already in flight
+            dedup_key = self._ingest_dedup_key(file_path, metadata)
+            task_id = uuid()
+            existing_task_id = self._claim_ingest_dedup_key(dedup_key, task_id)
+            if existing_task_id:
+                logger.info(
+                    f"Document ingestion already in flight, reusing task",
+                    extra={
+                        "extra_fields": {
+                            "file_path": file_path,
+                            "task_id": existing_task_id,
+                        }
+                    },
+                )
+                return existing_task_id
+
+            try:
+                result = task.apply_async(
+                    args=[file_path, metadata],
+                    kwargs={"dedup_key": dedup_key},
+                    task_id=task_id,
+                )
+            except Exception:
+                self._release_ingest_dedup_key(dedup_key, task_id)
+                raise
 
             logger.info(
                 f"Submitted document ingestion task",
@@ -213,20 +368,78 @@ class CeleryService:
             )
             return None
 
+    async def submit_ingest_document_async(
+        self, file_path: str, metadata: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """Submit document ingestion without blocking the event loop on the broker publish."""
+        return await asyncio.to_thread(self.submit_ingest_document, file_path, metadata)
+
+    def submit_batch_embeddings(
+        self, texts: List[str], cache: bool = True, chunk_size: Optional[int] = None
+    ) -> Optional[str]:
+        """Fan batch embedding out over workers as a chord; returns the callback task ID."""
+        if not self.is_initialized or not self.celery_app:
+            logger.warning("Celery service not initialized, cannot submit tasks")
+            return None
+
+        chunk_size = chunk_size or settings.EMBEDDING_BATCH_SIZE
+
+        try:
+            embed_task = self.celery_app.tasks.get("tasks.batch_embeddings")
+            assemble_task = self.celery_app.tasks.get("tasks.assemble_embeddings")
+            if not embed_task or not assemble_task:
+                logger.error("Batch embedding tasks not registered")
+                return None
+
+            signatures = [
+                embed_task.s(texts[i : i + chunk_size], cache)
+                for i in range(0, len(texts), chunk_size)
+            ]
+            result = chord(group(signatures))(assemble_task.s())
+
+            logger.info(
+                f"Submitted batch embedding chord",
+                extra={
+                    "extra_fields": {
+                        "text_count": len(texts),
+                        "chunk_count": len(signatures),
+                        "task_id": result.id,
+                    }
+                },
+            )
+
+            return result.id
+
+        except Exception as e:
+            logger.error(
+                f"Failed to submit batch embedding chord: {str(e)}",
+                extra={
+                    "extra_fields": {
+                        "error_type": type(e).__name__,
+                        "text_count": len(texts),
+                    }
+                },
+            )
+            return None
+
     def get_task_status(self, task_id: str) -> Dict[str, Any]:
         """Get status of a Celery task."""
         if not self.is_initialized or not self.celery_app:
             return {"status": "unavailable", "error": "Celery service not initialized"}
 
+        cached = self._get_cached_task_status(task_id)
+        if cached is not None:
+            return cached
+
         try:
-            result = self.celery_app.AsyncResult(task_id)
+            # One backend round-trip instead of separate state/result/ready/failed reads
+            meta = self.celery_app.backend.get_task_meta(task_id)
+            status = self._build_task_status(task_id, meta)
 
-            return {
-                "task_id": task_id,
-                "status": result.state,
-                "result": result.result if result.ready() else None,
-                "error": str(result.info) if result.failed() else None,
-            }
+            if meta["status"] in states.READY_STATES:
+                self._cache_task_status(task_id, status)
+
+            return status
 
         except Exception as e:
             logger.error(
@@ -240,6 +453,187 @@ class CeleryService:
             )
             return {"status": "error", "error": str(e)}
 
+    def get_task_statuses(self, task_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get status of many Celery tasks with a single backend MGET."""
+        if not self.is_initialized or not self.celery_app:
+            unavailable = {"status": "unavailable", "error": "Celery service not initialized"}
+            return {task_id: unavailable for task_id in task_ids}
+
+        statuses: Dict[str, Dict[str, Any]] = {}
+        to_fetch = []
+        for task_id in task_ids:
+            cached = self._get_cached_task_status(task_id)
+            if cached is not None:
+                statuses[task_id] = cached
+            else:
+                to_fetch.append(task_id)
+
+        if not to_fetch:
+            return statuses
+
+        try:
+            backend = self.celery_app.backend
+            if hasattr(backend, "mget"):
+                # Key-value backends (Redis): fetch every task meta in one round-trip
+                values = backend.mget([backend.get_key_for_task(t) for t in to_fetch])
+                metas = [
+                    backend.decode_result(value)
+                    if value
+                    else {"status": states.PENDING, "result": None}
+                    for value in values
+                ]
+            else:
+                metas = [backend.get_task_meta(t) for t in to_fetch]
+
+            for task_id, meta in zip(to_fetch, metas):
+                status = self._build_task_status(task_id, meta)
+                if meta["status"] in states.READY_STATES:
+                    self._cache_task_status(task_id, status)
+                statuses[task_id] = status
+
+            return statuses
+
+        except Exception as e:
+            logger.error(
+                f"Failed to get task statuses: {str(e)}",
+                extra={
+                    "extra_fields": {
+                        "error_type": type(e).__name__,
+                        "task_count": len(task_ids),
+                    }
+                },
+            )
+            error = {"status": "error", "error": str(e)}
+            statuses.update({task_id: error for task_id in to_fetch})
+            return statuses
+
+    def get_queue_lengths(self, queues: Optional[List[str]] = None) -> Dict[str, int]:
+        """Get pending message counts for broker queues in a single round-trip."""
+        if not self.is_initialized or not self.celery_app:
+            return {}
+
+        queues = queues or [self.celery_app.conf.task_default_queue]
+
+        try:
+            with self.celery_app.connection_for_read() as conn:
+                client = conn.default_channel.client
+                # Pipeline LLENs so N queues cost one RTT instead of N
+                pipe = client.pipeline(transaction=False)
+                for queue in queues:
+                    pipe.llen(queue)
+                lengths = pipe.execute()
+
+            return dict(zip(queues, lengths))
+
+        except Exception as e:
+            logger.error(
+                f"Failed to get queue lengths: {str(e)}",
+                extra={
+                    "extra_fields": {
+                        "error_type": type(e).__name__,
+                        "queues": queues,
+                    }
+                },
+            )
+            return {}
+
+    def get_active_tasks(self, timeout: float = 1.0) -> Dict[str, Any]:
+        """Get active, scheduled and reserved tasks across all workers."""
+        if not self.is_initialized or not self.celery_app:
+            return {"status": "unavailable", "error": "Celery service not initialized"}
+
+        try:
+            inspect = self.celery_app.control.inspect(timeout=timeout)
+            # Issue the three broadcasts concurrently: ~1x timeout instead of 3x
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                active, scheduled, reserved = executor.map(
+                    lambda query: query(),
+                    [inspect.active, inspect.scheduled, inspect.reserved],
+                )
+
+            return {
+                "active": active or {},
+                "scheduled": scheduled or {},
+                "reserved": reserved or {},
+            }
+
+        except Exception as e:
+            logger.error(
+                f"Failed to get active tasks: {str(e)}",
+                extra={"extra_fields": {"error_type": type(e).__name__}},
+            )
+            return {"status": "error", "error": str(e)}
+
+    def _ingest_dedup_key(
+        self, file_path: str, metadata: Optional[Dict[str, Any]]
+    ) -> str:
+        """Key identifying an ingestion request by file, mtime and metadata."""
+        try:
+            mtime = os.path.getmtime(file_path)
+        except OSError:
+            mtime = 0
+        signature = f"{file_path}:{mtime}:{json.dumps(metadata or {}, sort_keys=True, default=str)}"
+        digest = hashlib.blake2b(signature.encode(), digest_size=16).hexdigest()
+        return f"celery-dedup:ingest:{digest}"
+
+    def _claim_ingest_dedup_key(self, dedup_key: str, task_id: str) -> Optional[str]:
+        """Claim the dedup key for task_id; return the in-flight task ID if already claimed."""
+        client = getattr(self.celery_app.backend, "client", None)
+        if client is None:
+            return None
+
+        try:
+            ttl = _CELERY_CONF["task_time_limit"]
+            if client.set(dedup_key, task_id, nx=True, ex=ttl):
+                return None
+            existing = client.get(dedup_key)
+            if isinstance(existing, bytes):
+                existing = existing.decode()
+            return existing
+        except Exception as e:
+            # Dedup is best-effort; never block a submission on it
+            logger.warning(f"Ingestion dedup check failed: {str(e)}")
+            return None
+
+    def _release_ingest_dedup_key(self, dedup_key: str, task_id: str) -> None:
+        """Release task_id's claim on the dedup key once the ingestion finished or failed to enqueue."""
+        client = getattr(self.celery_app.backend, "client", None)
+        if client is None:
+            return
+
+        try:
+            client.eval(_RELEASE_DEDUP_KEY_SCRIPT, 1, dedup_key, task_id)
+        except Exception as e:
+            logger.warning(f"Failed to release ingestion dedup key: {str(e)}")
+
+    def _build_task_status(self, task_id: str, meta: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert backend task metadata into the task status response."""
+        state = meta["status"]
+        return {
+            "task_id": task_id,
+            "status": state,
+            "result": meta.get("result") if state in states.READY_STATES else None,
+            "error": str(meta.get("result")) if state == states.FAILURE else None,
+        }
+
+    def _get_cached_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Return a cached terminal status, dropping it once expired."""
+        cached = self._status_cache.get(task_id)
+        if cached is None:
+            return None
+        expires_at, status = cached
+        if expires_at > time.monotonic():
+            return status
+        del self._status_cache[task_id]
+        return None
+
+    def _cache_task_status(self, task_id: str, status: Dict[str, Any]) -> None:
+        """Remember the status of a task that reached a terminal state."""
+        if len(self._status_cache) >= self.STATUS_CACHE_MAX_SIZE:
+            # Evict the oldest entry (dicts preserve insertion order)
+            self._status_cache.pop(next(iter(self._status_cache)))
+        self._status_cache[task_id] = (time.monotonic() + self.STATUS_CACHE_TTL, status)
+
 
 # Global singleton instance
 celery_service = CeleryService()
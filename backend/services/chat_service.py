@@ -4,25 +4,88 @@ Chat Service for Lumina IQ RAG Backend.
 Handles chat and question generation using LangChain with Together AI.
 """
 
-from typing import List, Dict, Any, Optional
-from langchain_openai import ChatOpenAI
-from langchain.prompts import (
-    ChatPromptTemplate,
-    SystemMessagePromptTemplate,
-    HumanMessagePromptTemplate,
-)
-from langchain.schema import HumanMessage, SystemMessage, AIMessage
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, AsyncIterator
+import httpx
+from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 from config.settings import settings
 from utils.logger import get_logger
+from utils.text import truncate_context
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 logger = get_logger("chat_service")
 
+QUIZ_SYSTEM_PROMPT = """You are an expert educational content creator specializing in creating high-quality quiz questions.
+Generate multiple-choice quiz questions that test understanding and critical thinking.
+Each question should be clear, unambiguous, and have only one correct answer.
+
+IMPORTANT: Return your response as a JSON object. Do NOT use markdown code blocks, bold, italic, or special formatting INSIDE the question text itself. Keep all question content as plain text."""
+
+QUIZ_FORMAT_PROMPT = """Based on the context in the next message, generate the requested number of multiple-choice quiz questions.
+
+Return your response as a valid JSON object in this EXACT format:
+{
+  "questions": [
+    "Q1: [Question text in plain text]\\nA) [Option A]\\nB) [Option B]\\nC) [Option C]\\nD) [Option D]\\nCorrect Answer: [A/B/C/D]\\nExplanation: [Brief explanation]",
+    "Q2: [Question text in plain text]\\nA) [Option A]\\nB) [Option B]\\nC) [Option C]\\nD) [Option D]\\nCorrect Answer: [A/B/C/D]\\nExplanation: [Brief explanation]"
+  ]
+}
+
+CRITICAL: Return ONLY the JSON object, no extra text before or after. Each question should be a single string with newline characters (\\n) separating lines. Do NOT use markdown formatting like backticks, asterisks, or code blocks inside the question text."""
+
+PRACTICE_SYSTEM_PROMPT = """You are an expert educational content creator specializing in creating thought-provoking practice questions.
+Generate open-ended questions that encourage critical thinking and deep understanding.
+
+IMPORTANT: Return your response as a JSON object with plain text questions."""
+
+PRACTICE_FORMAT_PROMPT = """Based on the context in the next message, generate the requested number of practice questions that help understand key concepts.
+
+Return your response as a valid JSON object in this EXACT format:
+{
+  "questions": [
+    "Q1: [Question text]",
+    "Q2: [Question text]",
+    "Q3: [Question text]"
+  ]
+}
+
+CRITICAL: Return ONLY the JSON object, no extra text. Do NOT use markdown formatting inside the questions."""
+
+QUESTION_CONTEXT_TEMPLATE = "Context:\n{context}\n\n{topic_instruction}\n\nGenerate {count} questions now:"
+TOPIC_INSTRUCTION_TEMPLATE = "Focus specifically on the topic: {topic}"
+DEFAULT_TOPIC_INSTRUCTION = "Cover all key concepts from the context comprehensively."
+
+CHAT_SYSTEM_PROMPT = """You are a helpful AI assistant with expertise in the documents provided. 
+Your role is to answer questions conversationally and naturally based on the context given.
+Be concise, accurate, and helpful. If the context doesn't contain enough information to fully answer the question, say so."""
+
+CHAT_USER_TEMPLATE = """Context from documents:
+{context}
+
+User question: {query}
+
+Please provide a clear, conversational answer based on the context above:"""
+
+SUMMARY_SYSTEM_PROMPT = "You are a helpful assistant that creates concise and accurate summaries."
+SUMMARY_USER_TEMPLATE = "Summarize the following text:\n\n{text}"
+SUMMARY_LIMITED_USER_TEMPLATE = (
+    SUMMARY_USER_TEMPLATE + "\n\nLimit the summary to approximately {max_length} words."
+)
+
+# (system prompt, format spec) per mode - identical across calls so providers can cache the prefix
+QUESTION_PROMPTS = {
+    "quiz": (QUIZ_SYSTEM_PROMPT, QUIZ_FORMAT_PROMPT),
+    "practice": (PRACTICE_SYSTEM_PROMPT, PRACTICE_FORMAT_PROMPT),
+}
+
 
 class ChatService:
     """Service for chat and question generation using LangChain + Together AI."""
 
     def __init__(self):
-        self.llm: Optional[ChatOpenAI] = None
+        self.llm: Optional["ChatOpenAI"] = None
+        self.http_client: Optional[httpx.AsyncClient] = None
         self.is_initialized = False
 
     def initialize(self) -> None:
@@ -42,6 +105,20 @@ class ChatService:
                 },
             )
 
+            # Deferred import: langchain_openai pulls in the OpenAI SDK stack
+            from langchain_openai import ChatOpenAI
+
+            # Long-lived pooled client so TCP/TLS handshakes are reused across calls
+            self.http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=50,
+                    keepalive_expiry=90,
+                ),
+                timeout=httpx.Timeout(120.0, connect=10.0),
+                http2=True,
+            )
+
             # Initialize LangChain ChatOpenAI with Together AI
             self.llm = ChatOpenAI(
                 model=settings.TOGETHER_MODEL,
@@ -49,6 +126,7 @@ class ChatService:
                 openai_api_key=settings.TOGETHER_API_KEY,
                 temperature=0.7,
                 max_tokens=4000,
+                http_async_client=self.http_client,
             )
 
             self.is_initialized = True
@@ -56,12 +134,45 @@ class ChatService:
 
         except Exception as e:
             logger.error(
-                f"Failed to initialize chat service: {str(e)}",
+                "Failed to initialize chat service: %s",
+                e,
                 extra={"extra_fields": {"error_type": type(e).__name__}},
             )
             self.is_initialized = False
             raise
 
+    async def cleanup(self) -> None:
+        """Close the pooled HTTP client."""
+        if self.http_client:
+            await self.http_client.aclose()
+            self.http_client = None
+        self.llm = None
+        self.is_initialized = False
+
+    @staticmethod
+    def _to_langchain_messages(messages: List[Dict[str, str]]) -> list:
+        """Convert role/content dicts to LangChain message objects."""
+        langchain_messages = []
+        for msg in messages:
+            role = msg.get("role", "user")
+            content = msg.get("content", "")
+
+            if role == "system":
+                langchain_messages.append(SystemMessage(content=content))
+            elif role == "user":
+                langchain_messages.append(HumanMessage(content=content))
+            elif role == "assistant":
+                langchain_messages.append(AIMessage(content=content))
+        return langchain_messages
+
+    @staticmethod
+    def _call_params(temperature: float, max_tokens: Optional[int]) -> Dict[str, Any]:
+        """Per-call parameters passed with the request instead of mutating the shared LLM."""
+        call_params: Dict[str, Any] = {"temperature": temperature}
+        if max_tokens:
+            call_params["max_tokens"] = max_tokens
+        return call_params
+
     async def generate_response(
         self,
         messages: List[Dict[str, str]],
@@ -83,26 +194,11 @@ class ChatService:
                 },
             )
 
-            # Convert messages to LangChain format
-            langchain_messages = []
-            for msg in messages:
-                role = msg.get("role", "user")
-                content = msg.get("content", "")
-
-                if role == "system":
-                    langchain_messages.append(SystemMessage(content=content))
-                elif role == "user":
-                    langchain_messages.append(HumanMessage(content=content))
-                elif role == "assistant":
-                    langchain_messages.append(AIMessage(content=content))
-
-            # Update LLM parameters if needed
-            if max_tokens:
-                self.llm.max_tokens = max_tokens
-            self.llm.temperature = temperature
+            langchain_messages = self._to_langchain_messages(messages)
+            call_params = self._call_params(temperature, max_tokens)
 
             # Generate response
-            response = await self.llm.ainvoke(langchain_messages)
+            response = await self.llm.ainvoke(langchain_messages, **call_params)
             content = response.content
 
             logger.debug(
@@ -118,7 +214,39 @@ class ChatService:
 
         except Exception as e:
             logger.error(
-                f"Failed to generate chat response: {str(e)}",
+                "Failed to generate chat response: %s",
+                e,
+                extra={
+                    "extra_fields": {
+                        "error_type": type(e).__name__,
+                        "message_count": len(messages),
+                    }
+                },
+            )
+            raise
+
+    async def generate_response_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """Stream chat response content chunks as the model produces them."""
+        if not self.is_initialized or not self.llm:
+            raise RuntimeError("Chat service not initialized")
+
+        try:
+            langchain_messages = self._to_langchain_messages(messages)
+            call_params = self._call_params(temperature, max_tokens)
+
+            async for chunk in self.llm.astream(langchain_messages, **call_params):
+                if chunk.content:
+                    yield chunk.content
+
+        except Exception as e:
+            logger.error(
+                "Failed to stream chat response: %s",
+                e,
                 extra={
                     "extra_fields": {
                         "error_type": type(e).__name__,
@@ -141,82 +269,39 @@ class ChatService:
 
         try:
             logger.info(
-                f"Generating questions from context: count={count}, mode={mode}, topic={topic}, context_length={len(context)}"
+                "Generating questions from context: count=%d, mode=%s, topic=%s, context_length=%d",
+                count,
+                mode,
+                topic,
+                len(context),
             )
 
-            # Build prompt based on mode
-            if mode == "quiz":
-                system_prompt = """You are an expert educational content creator specializing in creating high-quality quiz questions.
-Generate multiple-choice quiz questions that test understanding and critical thinking.
-Each question should be clear, unambiguous, and have only one correct answer.
-
-IMPORTANT: Return your response as a JSON object. Do NOT use markdown code blocks, bold, italic, or special formatting INSIDE the question text itself. Keep all question content as plain text."""
-
-                user_prompt = """Based on the following context, generate {count} multiple-choice quiz questions.
-
-Return your response as a valid JSON object in this EXACT format:
-{{
-  "questions": [
-    "Q1: [Question text in plain text]\\nA) [Option A]\\nB) [Option B]\\nC) [Option C]\\nD) [Option D]\\nCorrect Answer: [A/B/C/D]\\nExplanation: [Brief explanation]",
-    "Q2: [Question text in plain text]\\nA) [Option A]\\nB) [Option B]\\nC) [Option C]\\nD) [Option D]\\nCorrect Answer: [A/B/C/D]\\nExplanation: [Brief explanation]"
-  ]
-}}
-
-Context:
-{context}
-
-{topic_instruction}
-
-CRITICAL: Return ONLY the JSON object, no extra text before or after. Each question should be a single string with newline characters (\\n) separating lines. Do NOT use markdown formatting like backticks, asterisks, or code blocks inside the question text.
-
-Generate the questions now:"""
-
-            else:  # practice mode
-                system_prompt = """You are an expert educational content creator specializing in creating thought-provoking practice questions.
-Generate open-ended questions that encourage critical thinking and deep understanding.
-
-IMPORTANT: Return your response as a JSON object with plain text questions."""
-
-                user_prompt = """Based on the following context, generate {count} practice questions that help understand key concepts.
-
-Return your response as a valid JSON object in this EXACT format:
-{{
-  "questions": [
-    "Q1: [Question text]",
-    "Q2: [Question text]",
-    "Q3: [Question text]"
-  ]
-}}
-
-Context:
-{context}
-
-{topic_instruction}
-
-CRITICAL: Return ONLY the JSON object, no extra text. Do NOT use markdown formatting inside the questions.
-
-Generate the questions now:"""
+            system_prompt, format_prompt = QUESTION_PROMPTS.get(
+                mode, QUESTION_PROMPTS["practice"]
+            )
 
             topic_instruction = (
-                f"Focus specifically on the topic: {topic}"
+                TOPIC_INSTRUCTION_TEMPLATE.format(topic=topic)
                 if topic
-                else "Cover all key concepts from the context comprehensively."
+                else DEFAULT_TOPIC_INSTRUCTION
             )
 
             # Limit context to avoid token limits
-            context_limited = context[:4000] if len(context) > 4000 else context
-
-            # Format prompts
-            formatted_user_prompt = user_prompt.format(
-                count=count,
-                context=context_limited,
-                topic_instruction=topic_instruction,
-            )
+            context_limited = truncate_context(context)
 
-            # Generate response
+            # Static system + format messages form a cacheable prompt prefix;
+            # only the trailing message varies between calls
             messages = [
                 {"role": "system", "content": system_prompt},
-                {"role": "user", "content": formatted_user_prompt},
+                {"role": "user", "content": format_prompt},
+                {
+                    "role": "user",
+                    "content": QUESTION_CONTEXT_TEMPLATE.format(
+                        context=context_limited,
+                        topic_instruction=topic_instruction,
+                        count=count,
+                    ),
+                },
             ]
 
             response = await self.generate_response(
@@ -240,7 +325,8 @@ Generate the questions now:"""
 
         except Exception as e:
             logger.error(
-                f"Failed to generate questions: {str(e)}",
+                "Failed to generate questions: %s",
+                e,
                 extra={
                     "extra_fields": {
                         "error_type": type(e).__name__,
@@ -259,23 +345,13 @@ Generate the questions now:"""
             raise RuntimeError("Chat service not initialized")
 
         try:
-            logger.info(f"Generating chat response - query_length: {len(query)}, context_length: {len(context)}")
-
-            system_prompt = """You are a helpful AI assistant with expertise in the documents provided. 
-Your role is to answer questions conversationally and naturally based on the context given.
-Be concise, accurate, and helpful. If the context doesn't contain enough information to fully answer the question, say so."""
-
-            user_prompt = f"""Context from documents:
-{context[:4000]}
-
-User question: {query}
+            logger.info(
+                "Generating chat response - query_length: %d, context_length: %d",
+                len(query),
+                len(context),
+            )
 
-Please provide a clear, conversational answer based on the context above:"""
-
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ]
+            messages = self._build_chat_messages(query, context)
 
             response = await self.generate_response(
                 messages=messages,
@@ -283,14 +359,47 @@ Please provide a clear, conversational answer based on the context above:"""
                 max_tokens=1000,
             )
 
-            logger.info(f"Generated chat response successfully - response_length: {len(response)}")
+            logger.info(
+                "Generated chat response successfully - response_length: %d",
+                len(response),
+            )
 
             return response
 
         except Exception as e:
-            logger.error(f"Failed to generate chat response: {str(e)}")
+            logger.error("Failed to generate chat response: %s", e)
             raise
 
+    async def generate_chat_response_stream(
+        self, query: str, context: str
+    ) -> AsyncIterator[str]:
+        """Stream a conversational chat response using RAG context."""
+        logger.info(
+            "Streaming chat response - query_length: %d, context_length: %d",
+            len(query),
+            len(context),
+        )
+
+        async for chunk in self.generate_response_stream(
+            messages=self._build_chat_messages(query, context),
+            temperature=0.7,
+            max_tokens=1000,
+        ):
+            yield chunk
+
+    @staticmethod
+    def _build_chat_messages(query: str, context: str) -> List[Dict[str, str]]:
+        """Build the system + user messages for a RAG chat turn."""
+        return [
+            {"role": "system", "content": CHAT_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": CHAT_USER_TEMPLATE.format(
+                    context=truncate_context(context), query=query
+                ),
+            },
+        ]
+
     async def summarize_text(self, text: str, max_length: Optional[int] = None) -> str:
         """Summarize text using LangChain."""
         if not self.is_initialized or not self.llm:
@@ -302,16 +411,15 @@ Please provide a clear, conversational answer based on the context above:"""
                 extra={"extra_fields": {"text_length": len(text)}},
             )
 
-            system_prompt = "You are a helpful assistant that creates concise and accurate summaries."
-            user_prompt = f"Summarize the following text:\n\n{text}"
-
             if max_length:
-                user_prompt += (
-                    f"\n\nLimit the summary to approximately {max_length} words."
+                user_prompt = SUMMARY_LIMITED_USER_TEMPLATE.format(
+                    text=text, max_length=max_length
                 )
+            else:
+                user_prompt = SUMMARY_USER_TEMPLATE.format(text=text)
 
             messages = [
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt},
             ]
 
@@ -331,7 +439,8 @@ Please provide a clear, conversational answer based on the context above:"""
 
         except Exception as e:
             logger.error(
-                f"Failed to summarize text: {str(e)}",
+                "Failed to summarize text: %s",
+                e,
                 extra={
                     "extra_fields": {
                         "error_type": type(e).__name__,
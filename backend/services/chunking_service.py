@@ -4,22 +4,55 @@ Chunking Service for Lumina IQ RAG Backend.
 Handles text chunking using LlamaIndex with configurable strategies.
 """
 
-from typing import List, Dict, Any, Optional
-from llama_index.core import Document
-from llama_index.core.node_parser import SentenceSplitter
-from llama_index.core.schema import TextNode
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
 from config.settings import settings
 from utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from llama_index.core import Document
+    from llama_index.core.node_parser import SentenceSplitter
+    from llama_index.core.schema import TextNode
+
 logger = get_logger("chunking_service")
 
+# Per-process splitter used by pool workers (built on first use)
+_worker_splitter: Optional["SentenceSplitter"] = None
+
+
+def _build_sentence_splitter() -> "SentenceSplitter":
+    """Create the SentenceSplitter configured from settings."""
+    # Deferred import keeps llama_index out of module import time
+    from llama_index.core.node_parser import SentenceSplitter
+
+    return SentenceSplitter(
+        chunk_size=settings.LLAMAINDEX_CHUNK_SIZE,
+        chunk_overlap=settings.LLAMAINDEX_CHUNK_OVERLAP,
+        separator=" ",
+        paragraph_separator="\n\n",
+    )
+
+
+def _split_documents_in_worker(documents: List["Document"]) -> List["TextNode"]:
+    """Split a batch of documents inside a pool worker process."""
+    global _worker_splitter
+    if _worker_splitter is None:
+        _worker_splitter = _build_sentence_splitter()
+    return _worker_splitter.get_nodes_from_documents(documents)
+
 
 class ChunkingService:
     """Service for text chunking using LlamaIndex."""
 
     def __init__(self):
-        self.sentence_splitter: Optional[SentenceSplitter] = None
+        self.sentence_splitter: Optional["SentenceSplitter"] = None
         self.is_initialized = False
+        self._process_pool: Optional[ProcessPoolExecutor] = None
 
     def initialize(self) -> None:
         """Initialize chunking service with LlamaIndex SentenceSplitter."""
@@ -35,65 +68,71 @@ class ChunkingService:
             )
 
             # Initialize LlamaIndex SentenceSplitter
-            self.sentence_splitter = SentenceSplitter(
-                chunk_size=settings.LLAMAINDEX_CHUNK_SIZE,
-                chunk_overlap=settings.LLAMAINDEX_CHUNK_OVERLAP,
-                separator=" ",
-                paragraph_separator="\n\n",
-            )
+            self.sentence_splitter = _build_sentence_splitter()
 
             self.is_initialized = True
             logger.info("Chunking service initialized successfully")
 
         except Exception as e:
             logger.error(
-                f"Failed to initialize chunking service: {str(e)}",
+                "Failed to initialize chunking service: %s",
+                e,
                 extra={"extra_fields": {"error_type": type(e).__name__}},
             )
             self.is_initialized = False
             raise
 
+    def cleanup(self) -> None:
+        """Shut down the chunking process pool, if one was started."""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(cancel_futures=True)
+            self._process_pool = None
+
     async def chunk_documents(
-        self, documents: List[Document]
-    ) -> List[TextNode]:
+        self, documents: List["Document"]
+    ) -> List["TextNode"]:
         """Chunk documents into smaller text nodes using LlamaIndex."""
         if not self.is_initialized or not self.sentence_splitter:
             raise RuntimeError("Chunking service not initialized")
 
         try:
-            logger.info(
-                "Chunking documents",
-                extra={
-                    "extra_fields": {
-                        "document_count": len(documents),
-                        "total_chars": sum(len(doc.text) for doc in documents),
-                    }
-                },
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Chunking documents: docs=%d",
+                    len(documents),
+                    extra={
+                        "extra_fields": {
+                            "document_count": len(documents),
+                            "total_chars": sum(len(doc.text) for doc in documents),
+                        }
+                    },
+                )
 
             # Use LlamaIndex node parser to create chunks
-            nodes = self.sentence_splitter.get_nodes_from_documents(documents)
-
-            # Enrich nodes with additional metadata
+            if self._should_split_in_parallel(len(documents)):
+                nodes = await self._split_documents_parallel(documents)
+            else:
+                nodes = self.sentence_splitter.get_nodes_from_documents(documents)
+
+            # Enrich nodes with additional metadata, collecting size stats in the same pass
+            total_chunks = len(nodes)
+            total_chars = 0
             for i, node in enumerate(nodes):
-                node.metadata.update(
-                    {
-                        "chunk_index": i,
-                        "chunk_size": len(node.text),
-                        "total_chunks": len(nodes),
-                    }
-                )
+                chunk_size = len(node.text)
+                metadata = node.metadata
+                metadata["chunk_index"] = i
+                metadata["chunk_size"] = chunk_size
+                metadata["total_chunks"] = total_chunks
+                total_chars += chunk_size
 
             logger.info(
                 "Successfully chunked documents",
                 extra={
                     "extra_fields": {
                         "document_count": len(documents),
-                        "chunk_count": len(nodes),
+                        "chunk_count": total_chunks,
                         "avg_chunk_size": (
-                            sum(len(node.text) for node in nodes) / len(nodes)
-                            if nodes
-                            else 0
+                            total_chars / total_chunks if total_chunks else 0
                         ),
                     }
                 },
@@ -103,7 +142,8 @@ class ChunkingService:
 
         except Exception as e:
             logger.error(
-                f"Failed to chunk documents: {str(e)}",
+                "Failed to chunk documents: %s",
+                e,
                 extra={
                     "extra_fields": {
                         "error_type": type(e).__name__,
@@ -115,17 +155,19 @@ class ChunkingService:
 
     async def chunk_text(
         self, text: str, metadata: Optional[Dict[str, Any]] = None
-    ) -> List[TextNode]:
+    ) -> List["TextNode"]:
         """Chunk raw text into nodes."""
         if not self.is_initialized or not self.sentence_splitter:
             raise RuntimeError("Chunking service not initialized")
 
         try:
             logger.debug(
-                f"Chunking text",
+                "Chunking text",
                 extra={"extra_fields": {"text_length": len(text)}},
             )
 
+            from llama_index.core import Document
+
             # Create a document from text
             doc = Document(text=text, metadata=metadata or {})
 
@@ -133,7 +175,7 @@ class ChunkingService:
             nodes = await self.chunk_documents([doc])
 
             logger.debug(
-                f"Successfully chunked text",
+                "Successfully chunked text",
                 extra={
                     "extra_fields": {
                         "text_length": len(text),
@@ -146,7 +188,8 @@ class ChunkingService:
 
         except Exception as e:
             logger.error(
-                f"Failed to chunk text: {str(e)}",
+                "Failed to chunk text: %s",
+                e,
                 extra={
                     "extra_fields": {
                         "error_type": type(e).__name__,
@@ -156,7 +199,41 @@ class ChunkingService:
             )
             raise
 
-    def get_chunk_stats(self, nodes: List[TextNode]) -> Dict[str, Any]:
+    def _should_split_in_parallel(self, document_count: int) -> bool:
+        """Whether a batch is large enough to fan out across processes."""
+        if document_count < settings.LLAMAINDEX_PARALLEL_CHUNKING_MIN_DOCS:
+            return False
+        # Celery prefork children are daemonic and may not spawn processes
+        return not multiprocessing.current_process().daemon
+
+    async def _split_documents_parallel(
+        self, documents: List["Document"]
+    ) -> List["TextNode"]:
+        """Split documents across a process pool, preserving document order."""
+        workers = settings.LLAMAINDEX_CHUNKING_MAX_WORKERS or os.cpu_count() or 1
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        # Contiguous slices keep prev/next node relationships intact, since
+        # those are only linked between nodes of the same source document
+        batch_size = -(-len(documents) // workers)
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    self._process_pool,
+                    _split_documents_in_worker,
+                    documents[start : start + batch_size],
+                )
+                for start in range(0, len(documents), batch_size)
+            )
+        )
+        return [node for batch in results for node in batch]
+
+    def get_chunk_stats(self, nodes: List["TextNode"]) -> Dict[str, Any]:
         """Get statistics about chunks."""
         try:
             if not nodes:
@@ -168,30 +245,48 @@ class ChunkingService:
                     "max_chunk_size": 0,
                 }
 
-            chunk_sizes = [len(node.text) for node in nodes]
+            # Single pass; avoids materializing a list of sizes
+            total_chars = 0
+            min_size = max_size = len(nodes[0].text)
+            for node in nodes:
+                size = len(node.text)
+                total_chars += size
+                if size < min_size:
+                    min_size = size
+                elif size > max_size:
+                    max_size = size
 
             return {
                 "chunk_count": len(nodes),
-                "total_chars": sum(chunk_sizes),
-                "avg_chunk_size": sum(chunk_sizes) / len(chunk_sizes),
-                "min_chunk_size": min(chunk_sizes),
-                "max_chunk_size": max(chunk_sizes),
+                "total_chars": total_chars,
+                "avg_chunk_size": total_chars / len(nodes),
+                "min_chunk_size": min_size,
+                "max_chunk_size": max_size,
             }
 
         except Exception as e:
             logger.error(
-                f"Failed to get chunk stats: {str(e)}",
+                "Failed to get chunk stats: %s",
+                e,
                 extra={"extra_fields": {"error_type": type(e).__name__}},
             )
             return {"error": str(e)}
 
     async def merge_small_chunks(
-        self, nodes: List[TextNode], min_size: int = 100
-    ) -> List[TextNode]:
+        self, nodes: List["TextNode"], min_size: int = 100
+    ) -> List["TextNode"]:
         """Merge chunks that are too small."""
+        # Only a short chunk followed by another chunk gets merged, so the
+        # trailing node's size never matters; when every earlier node is large
+        # enough there is nothing to do and the input is returned as-is
+        if not nodes or all(
+            len(node.text) >= min_size for node in islice(nodes, len(nodes) - 1)
+        ):
+            return nodes
+
         try:
             logger.debug(
-                f"Merging small chunks",
+                "Merging small chunks",
                 extra={
                     "extra_fields": {
                         "node_count": len(nodes),
@@ -202,25 +297,37 @@ class ChunkingService:
 
             merged_nodes = []
             current_node = None
+            # Texts of the group being merged into current_node; joined once on flush
+            parts: List[str] = []
+            current_len = 0
+
+            def flush() -> None:
+                if len(parts) > 1:
+                    current_node.text = " ".join(parts)
+                    current_node.metadata["chunk_size"] = len(current_node.text)
+                merged_nodes.append(current_node)
 
             for node in nodes:
                 if current_node is None:
                     current_node = node
-                elif len(current_node.text) < min_size:
+                    parts = [node.text]
+                    current_len = len(node.text)
+                elif current_len < min_size:
                     # Merge with current node
-                    current_node.text = f"{current_node.text} {node.text}"
-                    # Update metadata
-                    current_node.metadata["chunk_size"] = len(current_node.text)
+                    parts.append(node.text)
+                    current_len += 1 + len(node.text)
                 else:
-                    merged_nodes.append(current_node)
+                    flush()
                     current_node = node
+                    parts = [node.text]
+                    current_len = len(node.text)
 
             # Add the last node
             if current_node is not None:
-                merged_nodes.append(current_node)
+                flush()
 
             logger.debug(
-                f"Successfully merged small chunks",
+                "Successfully merged small chunks",
                 extra={
                     "extra_fields": {
                         "original_count": len(nodes),
@@ -233,7 +340,8 @@ class ChunkingService:
 
         except Exception as e:
             logger.error(
-                f"Failed to merge small chunks: {str(e)}",
+                "Failed to merge small chunks: %s",
+                e,
                 extra={"extra_fields": {"error_type": type(e).__name__}},
             )
             raise
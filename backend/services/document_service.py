@@ -4,29 +4,63 @@ Document Service for Lumina IQ RAG Backend.
 Handles PDF extraction and preprocessing using LlamaIndex.
 """
 
-from typing import List, Dict, Any, Optional
+import asyncio
+import mmap
+import os
+import stat
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 from pathlib import Path
 import hashlib
-from llama_index.core import SimpleDirectoryReader, Document
-from llama_index.readers.file import PDFReader
 from config.settings import settings
 from utils.logger import get_logger
 
+try:
+    import blake3  # type: ignore
+except ImportError:
+    blake3 = None
+
+if TYPE_CHECKING:
+    from llama_index.core import Document
+    from llama_index.readers.file import PDFReader
+
 logger = get_logger("document_service")
 
 
 class DocumentService:
     """Service for document extraction and preprocessing using LlamaIndex."""
 
+    HASH_CACHE_MAX_SIZE = 10_000
+
     def __init__(self):
-        self.pdf_reader = PDFReader()
+        self.pdf_reader: Optional["PDFReader"] = None
         self.is_initialized = False
+        self.hash_algorithm = "sha256"
+        # (path, mtime_ns, size, algorithm) -> file hash; lets re-scans skip
+        # unchanged files without mixing digests across algorithm changes
+        self._hash_cache: "OrderedDict[Tuple[str, int, int, str], str]" = OrderedDict()
+        self._hash_cache_lock = threading.Lock()
 
     def initialize(self) -> None:
         """Initialize document service."""
         try:
             logger.info("Initializing document service")
 
+            # Deferred import keeps llama_index readers out of module import time
+            from llama_index.readers.file import PDFReader
+
+            self.pdf_reader = PDFReader()
+
+            if settings.DEDUP_HASH_ALGORITHM == "blake3":
+                if blake3 is not None:
+                    self.hash_algorithm = "blake3"
+                else:
+                    logger.warning(
+                        "DEDUP_HASH_ALGORITHM=blake3 but blake3 is not installed "
+                        "(pip install 'lumina_iq[blake3]'), using sha256"
+                    )
+
             # Ensure books directory exists
             books_dir = Path(settings.BOOKS_DIR)
             books_dir.mkdir(parents=True, exist_ok=True)
@@ -40,26 +74,46 @@ class DocumentService:
             raise
 
     def _compute_file_hash(self, file_path: Path) -> str:
-        """Compute SHA256 hash of file for deduplication."""
-        sha256_hash = hashlib.sha256()
+        """Compute SHA256 (or BLAKE3, if configured) hash of file for deduplication."""
         with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+            st = os.fstat(f.fileno())
+            key = (str(file_path), st.st_mtime_ns, st.st_size, self.hash_algorithm)
+            with self._hash_cache_lock:
+                file_hash = self._hash_cache.get(key)
+                if file_hash is not None:
+                    self._hash_cache.move_to_end(key)
+                    return file_hash
+
+            if self.hash_algorithm == "blake3":
+                # SIMD, multithreaded tree hashing straight from the page cache
+                hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+                hasher.update_mmap(file_path)
+                file_hash = hasher.hexdigest()
+            else:
+                # file_digest reads into one reusable 256 KiB buffer; far fewer
+                # read/update calls than a small-chunk loop
+                file_hash = hashlib.file_digest(f, "sha256").hexdigest()
+
+        with self._hash_cache_lock:
+            self._hash_cache[key] = file_hash
+            if len(self._hash_cache) > self.HASH_CACHE_MAX_SIZE:
+                self._hash_cache.popitem(last=False)
+        return file_hash
 
     async def extract_from_pdf(
         self, file_path: Path, extract_metadata: bool = True
-    ) -> List[Document]:
+    ) -> List["Document"]:
         """Extract text and metadata from PDF using LlamaIndex."""
         if not self.is_initialized:
             raise RuntimeError("Document service not initialized")
 
         try:
-            file_size_mb = file_path.stat().st_size / (1024 * 1024)
+            # Single stat() reused for logging, thresholds and metadata
+            file_size_bytes = file_path.stat().st_size
+            file_size_mb = file_size_bytes / (1024 * 1024)
             logger.info(f"Extracting content from PDF - file_path: {str(file_path)}, file_size_mb: {file_size_mb:.2f}")
 
             # Check if file is large and should use specialized handling
-            file_size_mb = file_path.stat().st_size / (1024 * 1024)
             use_llamaindex_for_large = (
                 settings.LLAMAINDEX_USE_FOR_LARGE_PDFS
                 and file_size_mb > settings.LLAMAINDEX_LARGE_PDF_THRESHOLD_MB
@@ -81,7 +135,7 @@ class DocumentService:
                         "file_name": file_path.name,
                         "file_path": str(file_path),
                         "file_hash": file_hash,
-                        "file_size_bytes": file_path.stat().st_size,
+                        "file_size_bytes": file_size_bytes,
                         "page_number": i + 1,
                         "total_pages": len(documents),
                         "source": "pdf",
@@ -98,7 +152,7 @@ class DocumentService:
 
     async def extract_from_directory(
         self, directory_path: Path, file_pattern: str = "*.pdf"
-    ) -> List[Document]:
+    ) -> List["Document"]:
         """Extract content from all PDFs in a directory."""
         if not self.is_initialized:
             raise RuntimeError("Document service not initialized")
@@ -106,6 +160,8 @@ class DocumentService:
         try:
             logger.info(f"Extracting content from directory - directory: {str(directory_path)}, pattern: {file_pattern}")
 
+            from llama_index.core import SimpleDirectoryReader
+
             # Use SimpleDirectoryReader for batch processing
             reader = SimpleDirectoryReader(
                 input_dir=str(directory_path),
@@ -115,13 +171,30 @@ class DocumentService:
 
             documents = reader.load_data()
 
-            # Enrich with file hashes
+            # Enrich with file hashes. The reader yields one document per page,
+            # so hash each file once; sha256 releases the GIL, letting the
+            # files hash concurrently in worker threads
+            file_paths = {
+                doc.metadata["file_path"]
+                for doc in documents
+                if "file_path" in doc.metadata
+            }
+            file_paths = [p for p in file_paths if Path(p).exists()]
+            file_hashes = dict(
+                zip(
+                    file_paths,
+                    await asyncio.gather(
+                        *(
+                            asyncio.to_thread(self._compute_file_hash, Path(p))
+                            for p in file_paths
+                        )
+                    ),
+                )
+            )
             for doc in documents:
-                if "file_path" in doc.metadata:
-                    file_path = Path(doc.metadata["file_path"])
-                    if file_path.exists():
-                        file_hash = self._compute_file_hash(file_path)
-                        doc.metadata["file_hash"] = file_hash
+                file_hash = file_hashes.get(doc.metadata.get("file_path"))
+                if file_hash is not None:
+                    doc.metadata["file_hash"] = file_hash
 
             logger.info(f"Successfully extracted content from directory - document_count: {len(documents)}, directory: {str(directory_path)}")
 
@@ -134,16 +207,19 @@ class DocumentService:
     async def validate_document(self, file_path: Path) -> Dict[str, Any]:
         """Validate document before processing."""
         try:
-            if not file_path.exists():
+            # One stat() covers the existence, file-type and size checks
+            try:
+                st = file_path.stat()
+            except FileNotFoundError:
                 return {"valid": False, "error": "File does not exist"}
 
-            if not file_path.is_file():
+            if not stat.S_ISREG(st.st_mode):
                 return {"valid": False, "error": "Path is not a file"}
 
             if file_path.suffix.lower() != ".pdf":
                 return {"valid": False, "error": "File is not a PDF"}
 
-            file_size_mb = file_path.stat().st_size / (1024 * 1024)
+            file_size_mb = st.st_size / (1024 * 1024)
             if file_size_mb == 0:
                 return {"valid": False, "error": "File is empty"}
 
@@ -161,24 +237,45 @@ class DocumentService:
             logger.error(f"Failed to validate document: {str(e)} - error_type: {type(e).__name__}, file_path: {str(file_path)}")
             return {"valid": False, "error": str(e)}
 
-    async def get_document_metadata(self, file_path: Path) -> Dict[str, Any]:
-        """Extract metadata from document without full processing."""
+    @staticmethod
+    def _count_pdf_pages(file_path: Path) -> int:
+        """Read the page count from the PDF page tree without decoding pages."""
+        import PyPDF2
+
+        with open(file_path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            return len(PyPDF2.PdfReader(mm).pages)
+
+    async def get_document_metadata(
+        self, file_path: Path, accurate: bool = False
+    ) -> Dict[str, Any]:
+        """Extract metadata from document without full processing.
+
+        total_characters needs every page decoded, so the key is only
+        present when ``accurate`` is set.
+        """
         try:
             validation = await self.validate_document(file_path)
             if not validation["valid"]:
                 return validation
 
-            # Quick metadata extraction
-            documents = await self.extract_from_pdf(file_path, extract_metadata=True)
-
-            return {
+            metadata = {
                 "valid": True,
                 "file_name": file_path.name,
                 "file_size_mb": validation["file_size_mb"],
                 "file_hash": validation["file_hash"],
-                "page_count": len(documents),
-                "total_characters": sum(len(doc.text) for doc in documents),
             }
+            if accurate:
+                documents = await self.extract_from_pdf(file_path, extract_metadata=True)
+                metadata["page_count"] = len(documents)
+                metadata["total_characters"] = sum(len(doc.text) for doc in documents)
+            else:
+                metadata["page_count"] = await asyncio.to_thread(
+                    self._count_pdf_pages, file_path
+                )
+
+            return metadata
 
         except Exception as e:
             logger.error(f"Failed to get document metadata: {str(e)} - error_type: {type(e).__name__}, file_path: {str(file_path)}")
@@ -4,14 +4,61 @@ Embedding Service for Lumina IQ RAG Backend.
 Handles embedding generation using direct API calls to Together AI.
 """
 
+import asyncio
+import json
+import math
+import random
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import List, Dict, Any, Optional
 import httpx
+import numpy as np
 from config.settings import settings
 from utils.logger import get_logger
-from .cache_service import cache_service
+from .cache_service import cache_service, embedding_key, quantize_int8
+
+try:
+    import orjson
+
+    # Embedding responses run to megabytes of floats; orjson parses them in C
+    _json_encode = orjson.dumps
+    _json_decode = orjson.loads
+except ImportError:
+    _json_encode = json.JSONEncoder(separators=(",", ":")).encode
+    _json_decode = json.JSONDecoder().decode
 
 logger = get_logger("embedding_service")
 
+# Caps Together embedding requests in flight per process. EmbeddingService and
+# TogetherService both hit the same endpoint, so they acquire this one limiter
+embedding_request_semaphore = asyncio.Semaphore(settings.EMBEDDING_CONCURRENCY)
+
+# Limit text length to avoid token limits (32k tokens ≈ 128k chars);
+# 120k chars leaves room for special tokens
+MAX_EMBEDDING_CHARS = 120000
+
+# Rate-limited / overloaded responses are retried with full-jitter backoff
+RETRYABLE_STATUS_CODES = frozenset({429, 503})
+MAX_RATE_LIMIT_RETRIES = 3
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return seconds if math.isfinite(seconds) else None
+
 
 class EmbeddingService:
     """Service for generating embeddings using direct Together AI API calls."""
@@ -22,6 +69,18 @@ class EmbeddingService:
         self.model: str = ""
         self.client: Optional[httpx.AsyncClient] = None
         self.is_initialized = False
+        # In-process LRU (cache key -> embedding), checked before Redis.
+        # Entries are float32 arrays: ~4 KB per 1024-dim vector instead of
+        # ~32 KB as a list of Python floats. With EMBEDDING_CACHE_INT8 they
+        # are (int8 array, scale) pairs, another 4x smaller
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._cache_max_entries = settings.EMBEDDING_CACHE_MAX_ENTRIES
+        self._cache_int8 = settings.EMBEDDING_CACHE_INT8
+        # Shared by every caller so concurrent requests can't multiply the
+        # number of API calls in flight
+        self._request_semaphore = embedding_request_semaphore
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def initialize(self) -> None:
         """Initialize Together AI embedding service with direct API access."""
@@ -36,9 +95,23 @@ class EmbeddingService:
             self.base_url = settings.TOGETHER_BASE_URL.rstrip("/")
             self.model = settings.EMBEDDING_MODEL
             
-            # Initialize HTTP client
+            # Initialize HTTP client. HTTP/2 multiplexes the concurrent
+            # sub-batch requests; the pool is sized so they never queue on it.
+            # Transport retries only cover connection failures.
+            pool_size = max(32, settings.EMBEDDING_CONCURRENCY)
             self.client = httpx.AsyncClient(
-                timeout=60.0,
+                timeout=httpx.Timeout(60.0, connect=5.0),
+                # An explicit transport owns the pool settings; the client-level
+                # http2/limits arguments are ignored when one is given
+                transport=httpx.AsyncHTTPTransport(
+                    http2=True,
+                    limits=httpx.Limits(
+                        max_connections=pool_size,
+                        max_keepalive_connections=pool_size,
+                        keepalive_expiry=60.0,
+                    ),
+                    retries=2,
+                ),
                 headers={
                     "Authorization": f"Bearer {self.api_key}",
                     "Content-Type": "application/json",
@@ -60,6 +133,37 @@ class EmbeddingService:
             self.client = None
         self.is_initialized = False
     
+    def _cache_get(self, key: str) -> Optional[List[float]]:
+        """Look up the in-process cache, refreshing the entry's recency."""
+        embedding = self._cache.get(key)
+        if embedding is None:
+            self.cache_misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self.cache_hits += 1
+        if self._cache_int8:
+            q, scale = embedding
+            return (q.astype(np.float32) * scale).tolist()
+        return embedding.tolist()
+
+    def _cache_put(self, key: str, embedding: List[float]) -> None:
+        """Store in the in-process cache, evicting the least recently used entry."""
+        self._cache[key] = (
+            quantize_int8(embedding)
+            if self._cache_int8
+            else np.asarray(embedding, dtype=np.float32)
+        )
+        self._cache.move_to_end(key)
+        if len(self._cache) > self._cache_max_entries:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _sanitize(text: Any) -> str:
+        """Strip and length-limit text; empty/invalid input becomes a single space."""
+        if not text or not isinstance(text, str):
+            return " "
+        return text.strip()[:MAX_EMBEDDING_CHARS] or " "
+
     async def _call_embedding_api(self, texts: List[str]) -> List[List[float]]:
         """Make direct API call to Together AI embeddings endpoint."""
         if not self.client:
@@ -72,26 +176,47 @@ class EmbeddingService:
                 "input": texts
             }
             
-            response = await self.client.post(
-                f"{self.base_url}/embeddings",
-                json=payload
-            )
+            # Pre-encoded body; the client already sends the JSON Content-Type
+            body = _json_encode(payload)
+            for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+                response = await self.client.post(
+                    f"{self.base_url}/embeddings",
+                    content=body
+                )
+                if (
+                    response.status_code not in RETRYABLE_STATUS_CODES
+                    or attempt == MAX_RATE_LIMIT_RETRIES
+                ):
+                    break
+
+                # Full jitter keeps concurrent callers from retrying in lockstep
+                wait_time = random.uniform(0, min(2.0**attempt, 5.0))
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    # Capped: the wait holds a shared request slot
+                    wait_time = min(
+                        max(retry_after, wait_time), settings.EMBEDDING_MAX_RETRY_WAIT
+                    )
+                logger.warning(f"Embedding API returned {response.status_code}, retrying - attempt: {attempt + 1}, wait_seconds: {wait_time:.2f}")
+                await asyncio.sleep(wait_time)
             
             if response.status_code != 200:
                 error_detail = response.text
                 logger.error(f"Embedding API error: {response.status_code} - response: {error_detail}, texts_count: {len(texts)}")
                 raise RuntimeError(f"Error code: {response.status_code} - {error_detail}")
             
-            data = response.json()
+            data = _json_decode(response.content)
             
             # Extract embeddings from response
             # Together AI returns: {"object": "list", "data": [{"embedding": [...], "index": 0}, ...]}
             if "data" not in data:
                 raise RuntimeError(f"Unexpected API response format: {data}")
             
-            # Sort by index to maintain order
-            sorted_data = sorted(data["data"], key=lambda x: x.get("index", 0))
-            embeddings = [item["embedding"] for item in sorted_data]
+            # Together AI returns items in input order; only sort when it doesn't
+            items = data["data"]
+            if not all(item.get("index") == i for i, item in enumerate(items)):
+                items = sorted(items, key=lambda x: x.get("index", 0))
+            embeddings = [item["embedding"] for item in items]
             
             return embeddings
             
@@ -111,35 +236,37 @@ class EmbeddingService:
 
         try:
             # Sanitize input text
-            if not text or not isinstance(text, str):
-                text = " "
-            else:
-                text = text.strip()
-                if not text:
-                    text = " "
-                # Limit text length to 120k chars (for 32k token model)
-                if len(text) > 120000:
-                    text = text[:120000]
+            text = self._sanitize(text)
 
             # Check cache first if enabled
-            if use_cache and settings.CACHE_EMBEDDINGS:
+            use_cache = use_cache and settings.CACHE_EMBEDDINGS
+            if use_cache:
+                key = embedding_key(settings.EMBEDDING_MODEL, text)
+                cached_embedding = self._cache_get(key)
+                if cached_embedding is not None:
+                    return cached_embedding
+
                 cached_embedding = await cache_service.get_cached_embedding(
-                    text, settings.EMBEDDING_MODEL
+                    text, settings.EMBEDDING_MODEL, key=key
                 )
                 if cached_embedding:
+                    # Promote Redis hits so later lookups stay in-process
+                    self._cache_put(key, cached_embedding)
                     logger.debug(f"Using cached embedding - text_length: {len(text)}")
                     return cached_embedding
 
             logger.debug(f"Generating embedding for text - text_length: {len(text)}, model: {settings.EMBEDDING_MODEL}")
 
             # Generate embedding using direct API call
-            embeddings = await self._call_embedding_api([text])
+            async with self._request_semaphore:
+                embeddings = await self._call_embedding_api([text])
             embedding = embeddings[0]
 
             # Cache the embedding if enabled
-            if use_cache and settings.CACHE_EMBEDDINGS:
+            if use_cache:
+                self._cache_put(key, embedding)
                 await cache_service.cache_embedding(
-                    text, embedding, settings.EMBEDDING_MODEL
+                    text, embedding, settings.EMBEDDING_MODEL, key=key
                 )
 
             logger.debug(f"Generated embedding successfully - embedding_dim: {len(embedding)}, text_length: {len(text)}")
@@ -160,71 +287,91 @@ class EmbeddingService:
         try:
             logger.info(f"Generating embeddings for batch - batch_size: {len(texts)}, model: {settings.EMBEDDING_MODEL}")
 
-            embeddings = []
-            texts_to_embed = []
-            cache_indices = []
+            # Look up and embed each distinct text once; positions records
+            # every index it occupies so results can be fanned back out
+            positions: Dict[str, List[int]] = {}
+            for i, text in enumerate(texts):
+                positions.setdefault(text, []).append(i)
+            unique_texts = list(positions)
+
+            embeddings_by_text: Dict[str, List[float]] = {}
+            texts_to_embed = unique_texts
+
+            # Check the in-process cache, then Redis in one round trip, if enabled
+            use_cache = use_cache and settings.CACHE_EMBEDDINGS
+            if use_cache:
+                model = settings.EMBEDDING_MODEL
+                # Hash each distinct text once; both cache levels reuse the keys
+                keys = {text: embedding_key(model, text) for text in unique_texts}
+                l1_misses = []
+                for text in unique_texts:
+                    cached_embedding = self._cache_get(keys[text])
+                    if cached_embedding is not None:
+                        embeddings_by_text[text] = cached_embedding
+                    else:
+                        l1_misses.append(text)
 
-            # Check cache for each text if enabled
-            if use_cache and settings.CACHE_EMBEDDINGS:
-                for i, text in enumerate(texts):
-                    cached_embedding = await cache_service.get_cached_embedding(
-                        text, settings.EMBEDDING_MODEL
-                    )
+                cached_embeddings = await cache_service.get_cached_embeddings(
+                    l1_misses, model, keys=[keys[text] for text in l1_misses]
+                )
+                texts_to_embed = []
+                for text, cached_embedding in zip(l1_misses, cached_embeddings):
                     if cached_embedding:
-                        embeddings.append((i, cached_embedding))
+                        embeddings_by_text[text] = cached_embedding
+                        # Promote Redis hits so later lookups stay in-process
+                        self._cache_put(keys[text], cached_embedding)
                     else:
                         texts_to_embed.append(text)
-                        cache_indices.append(i)
 
-                logger.debug(f"Cache stats for batch - cached: {len(embeddings)}, to_generate: {len(texts_to_embed)}")
-            else:
-                texts_to_embed = texts
-                cache_indices = list(range(len(texts)))
+                logger.debug(f"Cache stats for batch - unique: {len(unique_texts)}, cached: {len(embeddings_by_text)}, to_generate: {len(texts_to_embed)}")
 
             # Generate embeddings for uncached texts
             if texts_to_embed:
                 # Validate and sanitize texts before embedding
-                sanitized_texts = []
-                for text in texts_to_embed:
-                    # Ensure text is not empty and is a string
-                    if not text or not isinstance(text, str):
-                        sanitized_texts.append(" ")  # Use single space for empty/invalid texts
-                    else:
-                        # Trim whitespace and ensure non-empty
-                        sanitized = text.strip()
-                        if not sanitized:
-                            sanitized = " "
-                        # Limit text length to avoid token limits (32k tokens ≈ 128k chars)
-                        # Using 120k chars to be safe and leave room for special tokens
-                        if len(sanitized) > 120000:
-                            sanitized = sanitized[:120000]
-                        sanitized_texts.append(sanitized)
-                
-                # Process in batches to avoid rate limits
-                batch_size = settings.EMBEDDING_BATCH_SIZE
-                new_embeddings = []
+                sanitize = self._sanitize
+                sanitized_texts = [sanitize(text) for text in texts_to_embed]
 
-                for i in range(0, len(sanitized_texts), batch_size):
-                    batch = sanitized_texts[i : i + batch_size]
-                    batch_embeddings = await self._call_embedding_api(batch)
-                    new_embeddings.extend(batch_embeddings)
-
-                    logger.debug(f"Generated batch embeddings - batch_start: {i}, batch_size: {len(batch)}")
+                # Process in batches to avoid rate limits, keeping a bounded
+                # number of API requests in flight at once
+                batch_size = settings.EMBEDDING_BATCH_SIZE
+                semaphore = self._request_semaphore
+
+                async def embed_batch(start: int) -> List[List[float]]:
+                    batch = sanitized_texts[start : start + batch_size]
+                    async with semaphore:
+                        batch_embeddings = await self._call_embedding_api(batch)
+                    logger.debug(f"Generated batch embeddings - batch_start: {start}, batch_size: {len(batch)}")
+                    return batch_embeddings
+
+                # gather preserves submission order, so results line up with texts
+                batch_results = await asyncio.gather(
+                    *(
+                        embed_batch(start)
+                        for start in range(0, len(sanitized_texts), batch_size)
+                    )
+                )
+                new_embeddings = [
+                    embedding for batch in batch_results for embedding in batch
+                ]
+                embeddings_by_text.update(zip(texts_to_embed, new_embeddings))
 
                 # Cache new embeddings if enabled
-                if use_cache and settings.CACHE_EMBEDDINGS:
+                if use_cache:
                     for text, embedding in zip(texts_to_embed, new_embeddings):
-                        await cache_service.cache_embedding(
-                            text, embedding, settings.EMBEDDING_MODEL
-                        )
-
-                # Merge with cached embeddings
-                for idx, embedding in zip(cache_indices, new_embeddings):
-                    embeddings.append((idx, embedding))
+                        self._cache_put(keys[text], embedding)
+                    await cache_service.cache_embeddings(
+                        texts_to_embed,
+                        new_embeddings,
+                        model,
+                        keys=[keys[text] for text in texts_to_embed],
+                    )
 
-            # Sort by original index to maintain order
-            embeddings.sort(key=lambda x: x[0])
-            result_embeddings = [emb for _, emb in embeddings]
+            # Fan each embedding out to every position its text occupied
+            result_embeddings: List[Optional[List[float]]] = [None] * len(texts)
+            for text, indices in positions.items():
+                embedding = embeddings_by_text[text]
+                for idx in indices:
+                    result_embeddings[idx] = embedding
 
             embedding_dim = len(result_embeddings[0]) if result_embeddings else 0
             logger.info(f"Generated batch embeddings successfully - total_embeddings: {len(result_embeddings)}, embedding_dim: {embedding_dim}")
@@ -235,46 +382,54 @@ class EmbeddingService:
             logger.error(f"Failed to generate batch embeddings: {str(e)} - error_type: {type(e).__name__}, batch_size: {len(texts)}")
             raise
 
-    async def compute_similarity(
+    def compute_similarity(
         self, embedding1: List[float], embedding2: List[float]
     ) -> float:
         """Compute cosine similarity between two embeddings."""
         try:
-            import math
+            a = np.asarray(embedding1, dtype=np.float32)
+            b = np.asarray(embedding2, dtype=np.float32)
 
-            # Compute dot product
-            dot_product = sum(a * b for a, b in zip(embedding1, embedding2))
-
-            # Compute magnitudes
-            magnitude1 = math.sqrt(sum(a * a for a in embedding1))
-            magnitude2 = math.sqrt(sum(b * b for b in embedding2))
-
-            # Compute cosine similarity
-            similarity = dot_product / (magnitude1 * magnitude2)
-
-            return similarity
+            # Cosine similarity via BLAS dot/norm kernels
+            return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
 
         except Exception as e:
             logger.error(f"Failed to compute similarity: {str(e)} - error_type: {type(e).__name__}")
             raise
 
-    async def find_similar_texts(
-        self, query_embedding: List[float], candidate_embeddings: List[List[float]]
+    def find_similar_texts(
+        self,
+        query_embedding: List[float],
+        candidate_embeddings: List[List[float]],
+        top_k: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
-        """Find most similar texts to query embedding."""
-        try:
-            similarities = []
+        """Find most similar texts to query embedding.
 
-            for i, candidate_embedding in enumerate(candidate_embeddings):
-                similarity = await self.compute_similarity(
-                    query_embedding, candidate_embedding
-                )
-                similarities.append({"index": i, "similarity": similarity})
+        Returns all candidates by descending similarity, or only the best
+        ``top_k`` when given.
+        """
+        try:
+            if not candidate_embeddings:
+                return []
+
+            # Score every candidate with a single matvec, then scale by the norms
+            candidates = np.asarray(candidate_embeddings, dtype=np.float32)
+            query = np.asarray(query_embedding, dtype=np.float32)
+            similarities = (candidates @ query) / (
+                np.linalg.norm(candidates, axis=1) * np.linalg.norm(query)
+            )
 
-            # Sort by similarity descending
-            similarities.sort(key=lambda x: x["similarity"], reverse=True)
+            # Sort by similarity descending; stable to keep ties in input order
+            if top_k is not None and top_k < len(similarities):
+                top = np.argpartition(-similarities, top_k - 1)[:top_k]
+                order = top[np.argsort(-similarities[top], kind="stable")]
+            else:
+                order = np.argsort(-similarities, kind="stable")
 
-            return similarities
+            return [
+                {"index": int(i), "similarity": float(similarities[i])}
+                for i in order
+            ]
 
         except Exception as e:
             logger.error(f"Failed to find similar texts: {str(e)} - error_type: {type(e).__name__}")
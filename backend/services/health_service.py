@@ -6,6 +6,7 @@ Provides comprehensive monitoring and health checks for all system dependencies.
 
 import asyncio
 import time
+from collections import deque
 from typing import Dict, Any
 from datetime import datetime
 
@@ -16,13 +17,26 @@ from .qdrant_service import qdrant_service
 
 logger = get_logger("health_service")
 
+# (epoch second, ISO string) of the last timestamp handed out
+_cached_iso = (0, "")
+
+
+def _now_iso() -> str:
+    """Current local time as ISO string, formatted at most once per second."""
+    global _cached_iso
+    now = int(time.time())
+    if now != _cached_iso[0]:
+        _cached_iso = (now, datetime.fromtimestamp(now).isoformat())
+    return _cached_iso[1]
+
 
 class HealthService:
     """Comprehensive health monitoring service."""
 
     def __init__(self):
         self._start_time = time.time()
-        self._response_times = []
+        # Bounded ring of recent response times; append evicts the oldest in O(1)
+        self._response_times = deque(maxlen=1000)
         self._error_counts = {"4xx": 0, "5xx": 0}
 
     async def check_liveness(self) -> Dict[str, Any]:
@@ -30,7 +44,7 @@ class HealthService:
         return {
             "status": "alive",
             "service": "lumina_iq_backend",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _now_iso(),
             "uptime_seconds": int(time.time() - self._start_time),
         }
 
@@ -42,7 +56,7 @@ class HealthService:
                     "status": "unhealthy",
                     "available": False,
                     "error": "Redis not initialized",
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": _now_iso()
                 }
 
             # Test connection with ping
@@ -54,7 +68,7 @@ class HealthService:
                 "status": "healthy",
                 "available": True,
                 "latency_ms": round(latency, 2),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
         except Exception as e:
             logger.warning(f"Redis health check failed: {str(e)}")
@@ -62,7 +76,7 @@ class HealthService:
                 "status": "unhealthy",
                 "available": False,
                 "error": str(e),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
 
     async def _check_qdrant_health(self) -> Dict[str, Any]:
@@ -73,7 +87,7 @@ class HealthService:
                     "status": "unhealthy",
                     "available": False,
                     "error": "Qdrant not initialized",
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": _now_iso()
                 }
 
             # Test connection with collection info
@@ -86,7 +100,7 @@ class HealthService:
                 "available": True,
                 "latency_ms": round(latency, 2),
                 "points_count": collection_info.get("points_count", 0),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
         except Exception as e:
             logger.warning(f"Qdrant health check failed: {str(e)}")
@@ -94,7 +108,7 @@ class HealthService:
                 "status": "unhealthy",
                 "available": False,
                 "error": str(e),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
 
     async def check_readiness(self) -> Dict[str, Any]:
@@ -113,7 +127,7 @@ class HealthService:
                     "status": "unhealthy",
                     "available": False,
                     "error": str(redis_health),
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": _now_iso()
                 }
 
             if isinstance(qdrant_health, Exception):
@@ -121,7 +135,7 @@ class HealthService:
                     "status": "unhealthy",
                     "available": False,
                     "error": str(qdrant_health),
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": _now_iso()
                 }
 
             # Determine overall readiness
@@ -137,7 +151,7 @@ class HealthService:
                     "redis": redis_health,
                     "qdrant": qdrant_health,
                 },
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
 
         except Exception as e:
@@ -146,7 +160,7 @@ class HealthService:
                 "status": "unhealthy",
                 "service": "lumina_iq_backend",
                 "error": str(e),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
 
     async def get_detailed_health(self) -> Dict[str, Any]:
@@ -177,7 +191,7 @@ class HealthService:
                     ),
                     "error_counts": self._error_counts,
                 },
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
 
         except Exception as e:
@@ -186,7 +200,7 @@ class HealthService:
                 "status": "unhealthy",
                 "service": "lumina_iq_backend",
                 "error": str(e),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
 
     async def get_prometheus_metrics(self) -> str:
@@ -265,9 +279,6 @@ class HealthService:
     def record_response_time(self, response_time_ms: float):
         """Record a response time for metrics."""
         self._response_times.append(response_time_ms)
-        # Keep only last 1000 measurements
-        if len(self._response_times) > 1000:
-            self._response_times = self._response_times[-1000:]
 
     def record_error(self, status_code: int):
         """Record an error for metrics."""
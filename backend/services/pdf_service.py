@@ -5,6 +5,7 @@ Handles PDF operations including listing, selection, upload, and metadata extrac
 This service bridges the routes layer with the new RAG architecture.
 """
 
+import mmap
 import os
 from pathlib import Path
 from datetime import datetime
@@ -87,8 +88,12 @@ class PDFService:
                 # Try to extract more detailed metadata using PyPDF2
                 try:
                     import PyPDF2
-                    with open(file_path, "rb") as f:
-                        pdf_reader = PyPDF2.PdfReader(f)
+                    # PyPDF2 only needs the xref, trailer and page tree here;
+                    # reading through an mmap faults in just those pages
+                    with open(file_path, "rb") as f, mmap.mmap(
+                        f.fileno(), 0, access=mmap.ACCESS_READ
+                    ) as mm:
+                        pdf_reader = PyPDF2.PdfReader(mm)
                         if pdf_reader.metadata:
                             metadata.update({
                                 "title": pdf_reader.metadata.get("/Title", metadata["title"]),
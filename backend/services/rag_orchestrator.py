@@ -4,10 +4,8 @@ RAG Orchestrator for Lumina IQ Backend.
 Coordinates all RAG services for end-to-end document processing and question generation.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 from pathlib import Path
-from llama_index.core import Document
-from llama_index.core.schema import TextNode
 from config.settings import settings
 from utils.logger import get_logger
 from .document_service import document_service
@@ -255,6 +253,33 @@ class RAGOrchestrator:
             )
             return {"success": False, "error": str(e)}
 
+    async def stream_chat_response(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter_conditions: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[str]:
+        """Retrieve context for a query and stream the chat answer."""
+        if not self.is_initialized:
+            raise RuntimeError("RAG orchestrator not initialized")
+
+        context = await self.retrieve_context(
+            query=query,
+            top_k=top_k,
+            filter_conditions=filter_conditions,
+        )
+
+        if not context:
+            logger.warning("No context retrieved from documents")
+            yield "I couldn't find relevant information in your documents."
+            return
+
+        async for chunk in chat_service.generate_chat_response_stream(
+            query=query,
+            context=context,
+        ):
+            yield chunk
+
     async def retrieve_context(
         self,
         query: Optional[str] = None,
@@ -4,20 +4,59 @@ Together AI Service for Lumina IQ RAG Backend.
 Provides integration with Together AI API for LLM and embedding generation.
 """
 
+import asyncio
 from typing import List, Dict, Any, Optional
-from together import Together
+from together import AsyncTogether
 from config.settings import settings
 from utils.logger import get_logger
+from utils.text import truncate_context
+from .embedding_service import embedding_request_semaphore
 
 logger = get_logger("together_service")
 
+QUESTION_SYSTEM_PROMPT = "You are an expert educational content creator. Generate high-quality questions that test understanding and promote learning."
+DEFAULT_TOPIC_INSTRUCTION = "Cover all key concepts from the context."
+
+QUIZ_PROMPT_TEMPLATE = """Based on the following context, generate {count} multiple-choice quiz questions.
+Each question should have 4 options (A, B, C, D) with only one correct answer.
+Format each question as:
+Q: [Question]
+A) [Option A]
+B) [Option B]
+C) [Option C]
+D) [Option D]
+Correct Answer: [A/B/C/D]
+Explanation: [Brief explanation]
+
+Context:
+{context}
+
+{topic_instruction}
+
+Generate the questions:"""
+
+PRACTICE_PROMPT_TEMPLATE = """Based on the following context, generate {count} practice questions that help understand the key concepts.
+Questions should be open-ended and encourage critical thinking.
+Format each question as:
+Q{{num}}: [Question]
+
+Context:
+{context}
+
+{topic_instruction}
+
+Generate the questions:"""
+
 
 class TogetherService:
     """Service for interacting with Together AI API."""
 
     def __init__(self):
-        self.client: Optional[Together] = None
+        self.client: Optional[AsyncTogether] = None
         self.is_initialized = False
+        # Same limiter as EmbeddingService, so EMBEDDING_CONCURRENCY caps the
+        # total embedding requests in flight across both services
+        self._request_semaphore = embedding_request_semaphore
 
     def initialize(self) -> None:
         """Initialize Together AI client."""
@@ -36,7 +75,8 @@ class TogetherService:
                 },
             )
 
-            self.client = Together(api_key=settings.TOGETHER_API_KEY)
+            # Async client: requests are awaited instead of blocking the event loop
+            self.client = AsyncTogether(api_key=settings.TOGETHER_API_KEY)
             self.is_initialized = True
 
             logger.info("Together AI service initialized successfully")
@@ -60,10 +100,11 @@ class TogetherService:
                 extra={"extra_fields": {"model": settings.EMBEDDING_MODEL}},
             )
 
-            response = self.client.embeddings.create(
-                input=text,
-                model=settings.EMBEDDING_MODEL,
-            )
+            async with self._request_semaphore:
+                response = await self.client.embeddings.create(
+                    input=text,
+                    model=settings.EMBEDDING_MODEL,
+                )
 
             embedding = response.data[0].embedding
 
@@ -109,12 +150,24 @@ class TogetherService:
                 },
             )
 
-            response = self.client.embeddings.create(
-                input=texts,
-                model=settings.EMBEDDING_MODEL,
-            )
+            # One request per EMBEDDING_BATCH_SIZE slice keeps each call under
+            # the API's per-request input limit; slices are sent concurrently,
+            # at most EMBEDDING_CONCURRENCY at a time
+            batch_size = settings.EMBEDDING_BATCH_SIZE
 
-            embeddings = [item.embedding for item in response.data]
+            async def embed_slice(start: int):
+                async with self._request_semaphore:
+                    return await self.client.embeddings.create(
+                        input=texts[start : start + batch_size],
+                        model=settings.EMBEDDING_MODEL,
+                    )
+
+            responses = await asyncio.gather(
+                *(embed_slice(start) for start in range(0, len(texts), batch_size))
+            )
+            embeddings = [
+                item.embedding for response in responses for item in response.data
+            ]
 
             logger.debug(
                 f"Generated batch embeddings successfully",
@@ -163,7 +216,7 @@ class TogetherService:
                 },
             )
 
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=settings.TOGETHER_MODEL,
                 messages=messages,
                 temperature=temperature,
@@ -212,53 +265,21 @@ class TogetherService:
             raise RuntimeError("Together AI service not initialized")
 
         try:
-            # Build prompt based on mode
-            if mode == "quiz":
-                prompt_template = """Based on the following context, generate {count} multiple-choice quiz questions.
-Each question should have 4 options (A, B, C, D) with only one correct answer.
-Format each question as:
-Q: [Question]
-A) [Option A]
-B) [Option B]
-C) [Option C]
-D) [Option D]
-Correct Answer: [A/B/C/D]
-Explanation: [Brief explanation]
-
-Context:
-{context}
-
-{topic_instruction}
-
-Generate the questions:"""
-            else:  # practice mode
-                prompt_template = """Based on the following context, generate {count} practice questions that help understand the key concepts.
-Questions should be open-ended and encourage critical thinking.
-Format each question as:
-Q{{num}}: [Question]
-
-Context:
-{context}
-
-{topic_instruction}
-
-Generate the questions:"""
-
+            prompt_template = (
+                QUIZ_PROMPT_TEMPLATE if mode == "quiz" else PRACTICE_PROMPT_TEMPLATE
+            )
             topic_instruction = (
-                f"Focus on the topic: {topic}" if topic else "Cover all key concepts from the context."
+                f"Focus on the topic: {topic}" if topic else DEFAULT_TOPIC_INSTRUCTION
             )
 
             prompt = prompt_template.format(
                 count=count,
-                context=context[:4000],  # Limit context length
+                context=truncate_context(context),  # Limit context length
                 topic_instruction=topic_instruction,
             )
 
             messages = [
-                {
-                    "role": "system",
-                    "content": "You are an expert educational content creator. Generate high-quality questions that test understanding and promote learning.",
-                },
+                {"role": "system", "content": QUESTION_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt},
             ]
 
@@ -166,6 +166,95 @@ def test_rag_orchestrator():
         return False
 
 
+def test_celery_worker_pool_check():
+    """Test the Celery worker pool guard with alias and class pool_cls values."""
+    try:
+        logger.info("Testing Celery worker pool check...")
+        from types import SimpleNamespace
+        from celery.concurrency.prefork import TaskPool as PreforkPool
+        from celery.concurrency.thread import TaskPool as ThreadPool
+        from services.celery_service import _check_worker_pool
+
+        for pool_cls in ("prefork", "solo", PreforkPool):
+            _check_worker_pool(sender=SimpleNamespace(pool_cls=pool_cls))
+
+        for pool_cls in ("threads", ThreadPool):
+            try:
+                _check_worker_pool(sender=SimpleNamespace(pool_cls=pool_cls))
+            except RuntimeError:
+                continue
+            raise AssertionError(f"Pool {pool_cls!r} was not rejected")
+
+        logger.info("✓ Celery worker pool check test passed")
+        return True
+    except Exception as e:
+        logger.error(f"✗ Celery worker pool check test failed: {str(e)}")
+        return False
+
+
+def test_chat_stream_error():
+    """Test that a failing chat stream ends with the error marker."""
+    try:
+        logger.info("Testing chat stream error handling...")
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from routes import chat as chat_routes
+
+        async def failing_stream(**kwargs):
+            yield "partial answer"
+            raise RuntimeError("LLM connection dropped")
+
+        app = FastAPI()
+        app.include_router(chat_routes.router)
+
+        original_initialized = rag_orchestrator.is_initialized
+        original_stream = rag_orchestrator.stream_chat_response
+        rag_orchestrator.is_initialized = True
+        rag_orchestrator.stream_chat_response = failing_stream
+        try:
+            response = TestClient(app).post(
+                "/api/chat/stream", json={"message": "hello"}
+            )
+        finally:
+            rag_orchestrator.is_initialized = original_initialized
+            rag_orchestrator.stream_chat_response = original_stream
+
+        assert response.status_code == 200, "Stream did not start"
+        assert response.text == "partial answer" + chat_routes.STREAM_ERROR_MARKER, (
+            "Failed stream did not end with the error marker"
+        )
+
+        logger.info("✓ Chat stream error test passed")
+        return True
+    except Exception as e:
+        logger.error(f"✗ Chat stream error test failed: {str(e)}")
+        return False
+
+
+def test_celery_task_registration():
+    """Test that initializing Celery registers every submitted task."""
+    try:
+        logger.info("Testing Celery task registration...")
+        from services.celery_service import celery_service
+
+        celery_service.initialize()
+        assert celery_service.celery_app is not None, "Celery app not created"
+
+        registered = celery_service.celery_app.tasks
+        for name in (
+            "tasks.ingest_document",
+            "tasks.batch_embeddings",
+            "tasks.assemble_embeddings",
+        ):
+            assert name in registered, f"{name} not registered"
+
+        logger.info("✓ Celery task registration test passed")
+        return True
+    except Exception as e:
+        logger.error(f"✗ Celery task registration test failed: {str(e)}")
+        return False
+
+
 async def main():
     """Run all tests."""
     logger.info("=" * 60)
@@ -183,6 +272,9 @@ async def main():
     results["chunking"] = test_chunking_service()
     results["chat"] = test_chat_service()
     results["rag_orchestrator"] = test_rag_orchestrator()
+    results["celery_pool_check"] = test_celery_worker_pool_check()
+    results["chat_stream_error"] = test_chat_stream_error()
+    results["celery_tasks"] = test_celery_task_registration()
     
     # Clean up
     await cache_service.close()
@@ -162,7 +162,8 @@ class CacheService:
 
     def _generate_embedding_cache_key(self, text: str) -> str:
         """Generate cache key for embedding based on text hash"""
-        return hashlib.md5(text.encode()).hexdigest()
+        # blake2b is faster than md5 in software and ships with hashlib
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
 
     async def get_cached_embedding(self, text: str) -> Optional[List[float]]:
         """Get cached embedding for text"""
@@ -1,36 +1,64 @@
 import hashlib
 from pathlib import Path
 from typing import Optional
+from config.settings import settings
 from utils.logger import get_logger
 
+try:
+    import blake3  # type: ignore
+except ImportError:
+    blake3 = None
+
 # Use enhanced logger
 logger = get_logger("file_hash")
 
 
+# Set once the blake3 fallback has been reported, so it is logged only once
+_blake3_fallback_warned = False
+
+
+def _resolve_algorithm(algorithm: Optional[str]) -> str:
+    """Default to DEDUP_HASH_ALGORITHM; blake3 falls back to sha256 when not installed."""
+    global _blake3_fallback_warned
+    algorithm = algorithm or settings.DEDUP_HASH_ALGORITHM
+    if algorithm == "blake3" and blake3 is None:
+        if not _blake3_fallback_warned:
+            logger.warning(
+                "blake3 requested but not installed (pip install 'lumina_iq[blake3]'), using sha256"
+            )
+            _blake3_fallback_warned = True
+        return "sha256"
+    return algorithm
+
+
 class FileHashService:
     """Service for calculating file hashes to detect duplicate uploads"""
 
     @staticmethod
-    def calculate_file_hash(file_path: str, algorithm: str = "sha256") -> Optional[str]:
+    def calculate_file_hash(file_path: str, algorithm: Optional[str] = None) -> Optional[str]:
         """
         Calculate hash of a file
 
         Args:
             file_path: Path to the file
-            algorithm: Hash algorithm to use (md5, sha1, sha256)
+            algorithm: Hash algorithm to use (md5, sha1, sha256, blake3);
+                defaults to DEDUP_HASH_ALGORITHM, matching DocumentService
 
         Returns:
             Hexadecimal hash string or None if error
         """
+        algorithm = _resolve_algorithm(algorithm)
         try:
-            hash_obj = hashlib.new(algorithm)
-
-            # Read file in chunks to handle large files
-            with open(file_path, "rb") as f:
-                while chunk := f.read(8192):
-                    hash_obj.update(chunk)
+            if algorithm == "blake3":
+                hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+                hasher.update_mmap(file_path)
+                file_hash = hasher.hexdigest()
+            else:
+                # file_digest streams the file through one reusable 256 KiB
+                # buffer, so large files are never loaded whole
+                with open(file_path, "rb") as f:
+                    file_hash = hashlib.file_digest(f, algorithm).hexdigest()
 
-            file_hash = hash_obj.hexdigest()
             logger.debug(f"Calculated hash: algorithm={algorithm}, file_path={file_path}, hash_value={file_hash[:16]}")
             return file_hash
 
@@ -39,17 +67,20 @@ class FileHashService:
             return None
 
     @staticmethod
-    def calculate_content_hash(content: bytes, algorithm: str = "sha256") -> str:
+    def calculate_content_hash(content: bytes, algorithm: Optional[str] = None) -> str:
         """
         Calculate hash of content bytes
 
         Args:
             content: File content as bytes
-            algorithm: Hash algorithm to use
+            algorithm: Hash algorithm to use; defaults to DEDUP_HASH_ALGORITHM
 
         Returns:
             Hexadecimal hash string
         """
+        algorithm = _resolve_algorithm(algorithm)
+        if algorithm == "blake3":
+            return blake3.blake3(content).hexdigest()
         hash_obj = hashlib.new(algorithm)
         hash_obj.update(content)
         return hash_obj.hexdigest()
@@ -0,0 +1,21 @@
+"""Text helpers shared by the LLM-facing services."""
+
+# Character budget for retrieved context sent to the LLM
+MAX_CONTEXT_CHARS = 4000
+
+
+def truncate_context(context: str, limit: int = MAX_CONTEXT_CHARS) -> str:
+    """
+    Clip context to at most `limit` characters, preferring a paragraph boundary.
+
+    Returns the original string untouched when it already fits. Otherwise cuts
+    at the last blank line before the limit, as long as that keeps at least
+    80% of the budget, so the model isn't handed a half sentence.
+    """
+    if len(context) <= limit:
+        return context
+
+    cut = context.rfind("\n\n", 0, limit)
+    if cut < limit * 0.8:
+        cut = limit
+    return context[:cut]